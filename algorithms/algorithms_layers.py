@@ -1,4 +1,6 @@
-from typing import List, Dict, Union, Optional
+from typing import List, Dict, Union, Optional, Tuple, Any
+
+import numpy as np
 
 from qgis.PyQt import QtWidgets
 from qgis.PyQt.QtCore import QVariant
@@ -11,67 +13,96 @@ from qgis.core import (QgsVectorDataProvider,
                        QgsFeature,
                        QgsMapLayer,
                        QgsVectorLayer,
-                       QgsRasterDataProvider,
                        QgsRectangle,
-                       QgsCoordinateReferenceSystem,
                        QgsRasterLayer,
-                       QgsRasterBandStats,
                        QgsProcessingUtils,
-                       QgsCoordinateTransformContext)
-
-from processing.algs.gdal.GdalUtils import GdalUtils
-
-from qgis.analysis import (QgsRasterCalculatorEntry, QgsRasterCalculator)
+                       QgsMemoryProviderUtils,
+                       QgsFeatureSink,
+                       QgsGeometry,
+                       QgsWkbTypes,
+                       QgsFeatureRequest,
+                       QgsProcessingException,
+                       NULL)
 
 from ..classes.definition_landuse_crop import LanduseCrop
 from ..classes.definition_landuse_values import LanduseValues
 from ..constants import TextConstants
 from ..classes.catalog import E3dCatalog
 from ..classes.class_KA5 import KA5Class
-from ..algorithms.utils import log, add_maplayer_to_project
+from ..algorithms.utils import (log,
+                               add_maplayer_to_project,
+                               attribute_request,
+                               iterate_in_chunks,
+                               ThrottledProgressBar)
+from ..algorithms.garbrecht_roughness import FEATURES_CHUNK_SIZE
+from ..algorithms.rasterizer import WindowedRasterizer, rasterize_features
+from ..algorithms.raster_blocks import (RasterGrid,
+                                        RasterBlockWriter,
+                                        raster_blocks,
+                                        read_block,
+                                        read_block_with_halo)
+from ..algorithms.slope_difference import difference_mask
+
+# nodata value of rasters created by QgsRasterCalculator
+RASTER_CALCULATOR_NO_DATA = float(np.finfo(np.float32).min)
 
 
 def rasterize_layer_by_example(vector_layer: QgsVectorLayer,
                                field_name_vectorize: str,
                                raster_template: QgsRasterLayer,
                                progress_bar: Optional[QtWidgets.QProgressBar] = None) -> QgsRasterLayer:
+    """
+    Burns values of `field_name_vectorize` into Float32 raster aligned to the grid of `raster_template`, cells without
+    feature get nodata value of the template. Raster is produced in row windows by `WindowedRasterizer` and every
+    window is written directly into the result GeoTIFF.
+    """
 
     if not progress_bar:
         progress_bar = QtWidgets.QProgressBar()
 
-    progress_bar.setMaximum(3)
-    progress_bar.setValue(1)
+    grid = RasterGrid.from_layer(raster_template)
 
-    extent: QgsRectangle = raster_template.extent()
+    extent: QgsRectangle = grid.extent
 
-    crs: QgsCoordinateReferenceSystem = vector_layer.crs()
+    no_data = raster_template.dataProvider().sourceNoDataValue(1)
 
-    extent_string = f"{extent.xMinimum()},{extent.xMaximum()},{extent.yMinimum()},{extent.yMaximum()} [{crs.authid()}]"
+    rasterizer = WindowedRasterizer(extent.xMinimum(),
+                                    extent.yMaximum(),
+                                    grid.cell_size_x,
+                                    grid.cell_size_y,
+                                    grid.width,
+                                    grid.height,
+                                    no_data)
 
-    raster_data_provider: QgsRasterDataProvider = raster_template.dataProvider()
-    no_data = raster_data_provider.sourceNoDataValue(1)
+    progress = ThrottledProgressBar(progress_bar, vector_layer.featureCount() + grid.height)
 
-    progress_bar.setValue(2)
+    field_index = vector_layer.fields().lookupField(field_name_vectorize)
 
-    result = processing.run("gdal:rasterize",
-                            {'INPUT': vector_layer,
-                             'FIELD': field_name_vectorize,
-                             'BURN': 0,
-                             'UNITS': 0,
-                             'WIDTH': raster_template.width(),
-                             'HEIGHT': raster_template.height(),
-                             'EXTENT': extent_string,
-                             'NODATA': no_data,
-                             'OPTIONS': '',
-                             'DATA_TYPE': 5,
-                             'INIT': None,
-                             'INVERT': False,
-                             'EXTRA': '',
-                             'OUTPUT': 'TEMPORARY_OUTPUT'})
+    if field_index == -1:
+        raise QgsProcessingException(f"Field `{field_name_vectorize}` not found in layer `{vector_layer.name()}`.")
 
-    progress_bar.setValue(3)
+    request = QgsFeatureRequest().setSubsetOfAttributes([field_index])
+
+    rasterize_features(rasterizer, vector_layer.getFeatures(request), field_index, progress)
+
+    raster_writer = RasterBlockWriter(QgsProcessingUtils.generateTempFilename("raster.tif"),
+                                      grid,
+                                      vector_layer.crs(),
+                                      no_data)
+
+    for row_start, window in rasterizer.windows():
+
+        raster_writer.write(row_start, window)
+
+        progress.set_value(vector_layer.featureCount() + row_start + window.shape[0])
 
-    return QgsRasterLayer(result["OUTPUT"], f"rasterized_{vector_layer.name()}")
+    progress.finish()
+
+    raster = raster_writer.close()
+
+    raster.setName(f"rasterized_{vector_layer.name()}")
+
+    return raster
 
 
 def copy_layer_fix_geoms(layer_input: QgsMapLayer, layer_name: str) -> QgsVectorLayer:
@@ -83,134 +114,163 @@ def copy_layer_fix_geoms(layer_input: QgsMapLayer, layer_name: str) -> QgsVector
     return result["OUTPUT"]
 
 
-def join_tables(layer_data: QgsVectorLayer,
-                layer_data_field_name_join: Union[str, List[str]],
-                layer_table: QgsVectorLayer,
-                layer_table_field_name_join: Union[str, List[str]],
-                progress_bar: QtWidgets.QProgressBar = None) -> QgsVectorLayer:
+def join_key(attributes: List[Any],
+             indices: List[int],
+             composite: bool) -> Any:
+    """
+    Value used to match features in `join_tables`, None if the feature cannot be joined. For composite join (list of
+    fields) values are merged into string `value1_value2_...` with empty values as empty strings.
+    """
 
-    if not progress_bar:
-        progress_bar = QtWidgets.QProgressBar()
+    if not composite:
 
-    merge_field_1 = "temp_merge_field_1"
-    merge_field_2 = "temp_merge_field_2"
+        value = attributes[indices[0]]
 
-    progress_bar.setMaximum(4)
+        return None if value == NULL else value
 
-    if isinstance(layer_data_field_name_join, list):
+    values = [str(attributes[index]) if attributes[index] else "" for index in indices]
 
-        layer_data_dp: QgsVectorDataProvider = layer_data.dataProvider()
+    if all(value == "" for value in values):
+        return None
 
-        add_fields = QgsFields()
+    return "_".join(values)
 
-        field = QgsField(merge_field_1, QVariant.String, "", 255)
 
-        add_fields.append(field)
+def join_field_indices(fields: QgsFields,
+                       field_name_join: Union[str, List[str]]) -> List[int]:
 
-        layer_data_dp.addAttributes(add_fields)
+    field_names = field_name_join if isinstance(field_name_join, list) else [field_name_join]
 
-        layer_data.updateFields()
+    indices = []
 
-        layer_data.startEditing()
+    for field_name in field_names:
 
-        feature: QgsFeature
+        index = fields.lookupField(field_name)
 
-        for feature in layer_data.getFeatures():
+        if index == -1:
+            raise KeyError(field_name)
 
-            attributes = []
+        indices.append(index)
 
-            for field_name in layer_data_field_name_join:
+    return indices
 
-                value = feature.attribute(field_name)
 
-                if not value:
-                    value = ""
+def join_lookup(layer_table: QgsVectorLayer,
+                layer_table_field_name_join: Union[str, List[str]]) -> Tuple[QgsFields, Dict[Any, List[Any]]]:
+    """
+    Fields joined from `layer_table` and `{join key: attributes}` of its first feature with each key. Fields of
+    composite join are not joined.
+    """
 
-                attributes.append(str(value))
+    composite = isinstance(layer_table_field_name_join, list)
 
-            if not all(x == "" for x in attributes):
-                attributes = "_".join(attributes)
+    fields = layer_table.fields()
 
-                layer_data.changeAttributeValue(feature.id(),
-                                                feature.fieldNameIndex(merge_field_1),
-                                                attributes)
+    indices = join_field_indices(fields, layer_table_field_name_join)
 
-        layer_data.commitChanges()
+    copied_indices = [index for index in range(fields.count()) if not (composite and index in indices)]
 
-        layer_data_field_name_join = merge_field_1
+    joined_fields = QgsFields()
 
-    progress_bar.setValue(1)
+    for index in copied_indices:
+        joined_fields.append(fields.at(index))
 
-    if isinstance(layer_table_field_name_join, list):
+    lookup = {}
 
-        layer_table_dp: QgsVectorDataProvider = layer_table.dataProvider()
+    feature: QgsFeature
 
-        add_fields = QgsFields()
+    for feature in layer_table.getFeatures(attribute_request(fields)):
 
-        field = QgsField(merge_field_2, QVariant.String, "", 255)
+        attributes = feature.attributes()
 
-        add_fields.append(field)
+        key = join_key(attributes, indices, composite)
 
-        layer_table_dp.addAttributes(add_fields)
+        if key is not None and key not in lookup:
+            lookup[key] = [attributes[index] for index in copied_indices]
 
-        layer_table.updateFields()
+    return joined_fields, lookup
 
-        layer_table.startEditing()
 
-        feature: QgsFeature
+def join_tables(layer_data: QgsVectorLayer,
+                layer_data_field_name_join: Union[str, List[str]],
+                layer_table: QgsVectorLayer,
+                layer_table_field_name_join: Union[str, List[str]],
+                progress_bar: QtWidgets.QProgressBar = None) -> QgsVectorLayer:
+    """
+    Joins attributes of `layer_table` to `layer_data` by hash lookup of join values, features without match get NULL
+    values. Result is new memory layer, input layers are not modified.
+    """
 
-        for feature in layer_table.getFeatures():
+    return join_tables_multiple(layer_data,
+                                [(layer_data_field_name_join, layer_table, layer_table_field_name_join)],
+                                progress_bar)
 
-            attributes = []
 
-            for field_name in layer_table_field_name_join:
+def join_tables_multiple(layer_data: QgsVectorLayer,
+                         joins: List[Tuple[Union[str, List[str]], QgsVectorLayer, Union[str, List[str]]]],
+                         progress_bar: QtWidgets.QProgressBar = None) -> QgsVectorLayer:
+    """
+    Joins several tables `(layer_data join fields, layer_table, layer_table join fields)` to `layer_data` in single
+    pass over its features. Result is the same as of `join_tables` applied for every join in order, but only one new
+    memory layer is created.
+    """
 
-                value = feature.attribute(field_name)
+    if not progress_bar:
+        progress_bar = QtWidgets.QProgressBar()
 
-                if not value:
-                    value = ""
+    fields = layer_data.fields()
 
-                attributes.append(str(value))
+    lookups = []
 
-            if not all(x == "" for x in attributes):
-                attributes = "_".join(attributes)
+    for layer_data_field_name_join, layer_table, layer_table_field_name_join in joins:
 
-                layer_table.changeAttributeValue(feature.id(),
-                                                 feature.fieldNameIndex(merge_field_2),
-                                                 attributes)
-        layer_table.commitChanges()
+        joined_fields, lookup = join_lookup(layer_table, layer_table_field_name_join)
 
-        fields_to_delete = []
-        for field_name in layer_table_field_name_join:
-            fields_to_delete.append(layer_table_dp.fieldNameIndex(field_name))
+        lookups.append((join_field_indices(layer_data.fields(), layer_data_field_name_join),
+                        isinstance(layer_data_field_name_join, list),
+                        lookup,
+                        [NULL] * joined_fields.count()))
 
-        layer_table.startEditing()
-        layer_table.deleteAttributes(fields_to_delete)
-        layer_table.commitChanges()
+        fields = QgsProcessingUtils.combineFields(fields, joined_fields)
 
-        layer_table_field_name_join = merge_field_2
+    result = QgsMemoryProviderUtils.createMemoryLayer(layer_data.name(), fields, layer_data.wkbType(), layer_data.crs())
 
-    progress_bar.setValue(2)
+    result_dp: QgsVectorDataProvider = result.dataProvider()
 
-    result = processing.run('qgis:joinattributestable',
-                            {'INPUT': layer_data,
-                             'FIELD': layer_data_field_name_join,
-                             'INPUT_2': layer_table,
-                             'FIELD_2': layer_table_field_name_join,
-                             'OUTPUT': f"memory:{layer_data.name()}"})
+    progress = ThrottledProgressBar(progress_bar, layer_data.featureCount())
 
-    progress_bar.setValue(3)
+    number = 0
 
-    if layer_data_field_name_join == merge_field_1 and layer_table_field_name_join == merge_field_2:
+    for features in iterate_in_chunks(layer_data.getFeatures(), FEATURES_CHUNK_SIZE):
 
-        result = processing.run("native:deletecolumn",
-                                {'INPUT': result['OUTPUT'],
-                                 'COLUMN': [layer_data_field_name_join, layer_table_field_name_join],
-                                 'OUTPUT': f"memory:{layer_data.name()}"},)
+        joined_features = []
 
-    progress_bar.setValue(4)
+        for feature in features:
+
+            attributes = feature.attributes()
+
+            joined_attributes = list(attributes)
+
+            for indices, composite, lookup, no_match in lookups:
+                joined_attributes.extend(lookup.get(join_key(attributes, indices, composite), no_match))
+
+            joined_feature = QgsFeature(fields)
+            joined_feature.setGeometry(feature.geometry())
+            joined_feature.setAttributes(joined_attributes)
+
+            joined_features.append(joined_feature)
+
+        result_dp.addFeatures(joined_features, QgsFeatureSink.FastInsert)
+
+        number += len(features)
+
+        progress.set_value(number)
 
-    return result['OUTPUT']
+    progress.finish()
+
+    result.updateExtents()
+
+    return result
 
 
 def intersect_dissolve(layer_input_1: QgsVectorLayer,
@@ -220,60 +280,118 @@ def intersect_dissolve(layer_input_1: QgsVectorLayer,
                        fieldname_landuse_crop: str,
                        dissolve_fields: List[str],
                        progress_bar: QtWidgets.QProgressBar) -> QgsVectorLayer:
+    """
+    Intersects the layers and dissolves the result by `dissolve_fields`. Intersection carries only the fields needed
+    for dissolve, `fieldname_new` (`landuse_crop_sid`) is computed while the intersection is read and geometries are
+    grouped by the dissolve key in a dictionary and united per group, so the only intermediate layer is the
+    intersection.
+    """
 
     progress_bar.setMaximum(4)
 
-    result = processing.run("native:intersection", {'INPUT': layer_input_1,
-                                                    'OVERLAY': layer_input_2,
-                                                    'INPUT_FIELDS': [],
-                                                    'OVERLAY_FIELDS': [],
-                                                    'OVERLAY_FIELDS_PREFIX': '',
-                                                    'OUTPUT': 'memory:intersection'})
+    needed_fields = dissolve_fields + [fieldname_sid, fieldname_landuse_crop]
 
-    layer_intersection: QgsVectorLayer = result["OUTPUT"]
+    layer_intersection: QgsVectorLayer = processing.run(
+        "native:intersection", {'INPUT': layer_input_1,
+                                'OVERLAY': layer_input_2,
+                                'INPUT_FIELDS': [field.name() for field in layer_input_1.fields()
+                                                 if field.name() in needed_fields],
+                                'OVERLAY_FIELDS': [field.name() for field in layer_input_2.fields()
+                                                   if field.name() in needed_fields],
+                                'OVERLAY_FIELDS_PREFIX': '',
+                                'OUTPUT': 'memory:intersection'})["OUTPUT"]
 
     progress_bar.setValue(1)
 
-    dp_layer_intersection: QgsVectorDataProvider = layer_intersection.dataProvider()
+    fields_intersection = layer_intersection.fields()
+
+    index_landuse_crop = fields_intersection.lookupField(fieldname_landuse_crop)
+    index_sid = fields_intersection.lookupField(fieldname_sid)
+
+    # fields of the dissolve list that are missing are skipped as in `native:retainfields`, but the new field cannot
+    # be computed without its source fields
+    missing_fields = [field_name for field_name, index in [(fieldname_landuse_crop, index_landuse_crop),
+                                                           (fieldname_sid, index_sid)]
+                      if index == -1]
+
+    if missing_fields:
+        raise QgsProcessingException(f"Fields `{'`, `'.join(missing_fields)}` not found in intersection of "
+                                     f"`{layer_input_1.name()}` and `{layer_input_2.name()}`.")
+
+    fields = QgsFields()
+
+    # index of dissolved field in intersection attributes, None for the new field
+    indices = []
+
+    for index, field in enumerate(fields_intersection):
+
+        if field.name() in dissolve_fields and field.name() != fieldname_new:
+            fields.append(field)
+            indices.append(index)
+
+    if fieldname_new in dissolve_fields:
+        fields.append(QgsField(fieldname_new, QVariant.String, "", 255))
+        indices.append(None)
 
-    add_fields = QgsFields()
+    groups: Dict[Tuple, Tuple[List[Any], List[QgsGeometry]]] = {}
 
-    field = QgsField(fieldname_new, QVariant.String, "", 255)
+    feature: QgsFeature
 
-    add_fields.append(field)
+    for feature in layer_intersection.getFeatures():
 
-    dp_layer_intersection.addAttributes(add_fields)
+        attributes = feature.attributes()
 
-    layer_intersection.updateFields()
+        value_new = "{}_{}".format(attributes[index_landuse_crop], attributes[index_sid])
 
-    layer_intersection.startEditing()
+        values = [value_new if index is None else attributes[index] for index in indices]
 
-    for number, feature in enumerate(layer_intersection.getFeatures()):
+        key = tuple([None if value == NULL else value for value in values])
 
-        attr_result = "{}_{}".format(feature.attribute(fieldname_landuse_crop),
-                                     feature.attribute(fieldname_sid))
+        if key not in groups:
+            groups[key] = (values, [])
 
-        layer_intersection.changeAttributeValue(feature.id(),
-                                                feature.fieldNameIndex(fieldname_new),
-                                                attr_result)
+        if feature.hasGeometry():
+            groups[key][1].append(feature.geometry())
 
-    layer_intersection.commitChanges()
+    del layer_intersection
 
     progress_bar.setValue(2)
 
-    result = processing.run("native:retainfields", {'INPUT': layer_intersection,
-                                                    'FIELDS': dissolve_fields,
-                                                    'OUTPUT': 'memory:removed_fields'})
+    layer_dissolved = QgsMemoryProviderUtils.createMemoryLayer("dissolve",
+                                                               fields,
+                                                               QgsWkbTypes.multiType(layer_input_1.wkbType()),
+                                                               layer_input_1.crs())
+
+    layer_dissolved_dp: QgsVectorDataProvider = layer_dissolved.dataProvider()
 
     progress_bar.setValue(3)
 
-    result = processing.run("native:dissolve", {'INPUT': result["OUTPUT"],
-                                                'FIELD': dissolve_fields,
-                                                'OUTPUT': 'memory:dissolve'})
+    for keys in iterate_in_chunks(list(groups.keys()), FEATURES_CHUNK_SIZE):
+
+        dissolved_features = []
+
+        for key in keys:
+
+            values, geometries = groups.pop(key)
+
+            geometry = QgsGeometry.unaryUnion(geometries)
+
+            if not geometry.isNull() and not geometry.isMultipart():
+                geometry.convertToMultiType()
+
+            dissolved_feature = QgsFeature(fields)
+            dissolved_feature.setGeometry(geometry)
+            dissolved_feature.setAttributes(values)
+
+            dissolved_features.append(dissolved_feature)
+
+        layer_dissolved_dp.addFeatures(dissolved_features, QgsFeatureSink.FastInsert)
+
+    layer_dissolved.updateExtents()
 
     progress_bar.setValue(4)
 
-    return result["OUTPUT"]
+    return layer_dissolved
 
 
 def create_table_to_join(dict_assigned_values: Dict[str, LanduseValues],
@@ -378,136 +496,94 @@ def retain_only_fields(layer: QgsVectorLayer,
 def replace_raster_values_by_raster(raster_orig: QgsRasterLayer,
                                     raster_new_values: QgsRasterLayer,
                                     progress_bar: Optional[QtWidgets.QProgressBar] = None) -> QgsRasterLayer:
+    """
+    Writes cells of `raster_new_values` into `raster_orig`, nodata of new values counts as 0. Cells with maximal new
+    value get that value, other cells get sum of both values, nodata of `raster_orig` stays nodata.
+
+    The maximum is taken from `raster_new_values` only, as in the original raster calculator expression. The new
+    values are the code of channel or drain elements, which is always one more than the highest code already in
+    `raster_orig`, so the maximum of new values marks exactly the cells to overwrite. If `raster_new_values` has no
+    valid cells, there is nothing to overwrite and `raster_orig` is returned unchanged.
+
+    Both rasters are read block by block on grid of `raster_orig`, first pass reads only new values to find their
+    maximum, second pass reads both rasters and writes the result, no intermediate rasters are written.
+    """
 
     if not progress_bar:
         progress_bar = QtWidgets.QProgressBar()
 
-    progress_bar.setMaximum(5)
+    grid = RasterGrid.from_layer(raster_orig)
 
-    progress_bar.setValue(1)
+    progress = ThrottledProgressBar(progress_bar, 2 * grid.height)
 
-    result = processing.run("native:fillnodata",
-                            {'INPUT': raster_new_values,
-                             'BAND': 1,
-                             'FILL_VALUE': 0,
-                             'OUTPUT': 'TEMPORARY_OUTPUT'})
+    max_value = None
 
-    raster_new_values = QgsRasterLayer(result["OUTPUT"])
+    for row_start, new_values in raster_blocks(raster_new_values, grid):
 
-    progress_bar.setValue(2)
+        if not np.isnan(new_values).all():
 
-    raster_new_values_dp = raster_new_values.dataProvider()
+            block_max = np.nan_to_num(new_values, nan=0).max()
 
-    stats = raster_new_values_dp.bandStatistics(1, QgsRasterBandStats.All, raster_new_values.extent())
-    max_value = str(round(stats.maximumValue))
+            if max_value is None or max_value < block_max:
+                max_value = block_max
 
-    progress_bar.setValue(3)
+        progress.set_value(row_start + new_values.shape[0])
 
-    one_value_raster = QgsRasterCalculatorEntry()
-    one_value_raster.ref = 'one_value_raster@1'
-    one_value_raster.raster = raster_new_values
-    one_value_raster.bandNumber = 1
-
-    org_raster = QgsRasterCalculatorEntry()
-    org_raster.ref = 'org_rast@1'
-    org_raster.raster = raster_orig
-    org_raster.bandNumber = 1
-
-    raster_entries = []
-    raster_entries.append(one_value_raster)
-    raster_entries.append(org_raster)
-
-    expression = "({0} != {1}) * {2} + {0}".format(one_value_raster.ref,
-                                                   max_value,
-                                                   org_raster.ref)
-
-    extent = raster_orig.extent()
-    output_raster_filename = QgsProcessingUtils.generateTempFilename("raster.tif")
-
-    calc = QgsRasterCalculator(
-        expression,
-        output_raster_filename,
-        GdalUtils.getFormatShortNameFromFilename(output_raster_filename),
-        extent,
-        raster_orig.crs(),
-        int(extent.width()),
-        int(extent.height()),
-        raster_entries,
-        QgsCoordinateTransformContext()
-    )
+    if max_value is None:
 
-    progress_bar.setValue(4)
+        log(f"Raster `{raster_new_values.name()}` has no valid cells, `{raster_orig.name()}` is not changed.")
+
+        return raster_orig
+
+    max_value = round(max_value)
+
+    raster_writer = RasterBlockWriter(QgsProcessingUtils.generateTempFilename("raster.tif"),
+                                      grid,
+                                      raster_orig.crs(),
+                                      RASTER_CALCULATOR_NO_DATA)
 
-    calc.processCalculation()
+    for row_start, row_end in grid.row_windows():
 
-    progress_bar.setValue(5)
+        new_values = np.nan_to_num(read_block(raster_new_values, grid, row_start, row_end), nan=0)
+        orig_values = read_block(raster_orig, grid, row_start, row_end)
 
-    return QgsRasterLayer(output_raster_filename)
+        raster_writer.write(row_start, (new_values != max_value) * orig_values + new_values)
+
+        progress.set_value(grid.height + row_end)
+
+    progress.finish()
+
+    return raster_writer.close()
 
 
 def find_difference_and_assign_value(first_raster: QgsRasterLayer,
                                      second_raster: QgsRasterLayer,
                                      value: int) -> QgsRasterLayer:
+    """
+    Raster with `value` in cells where the rasters or their slopes (as computed by `native:slope`) differ and 0
+    elsewhere, nodata where any of them is nodata.
+
+    Both rasters are read in row blocks with one halo row on each side, slopes are computed in the same pass and only
+    for blocks that are not identical in both rasters, no intermediate rasters are written.
+    """
+
+    grid = RasterGrid.from_layer(first_raster)
+
+    raster_writer = RasterBlockWriter(QgsProcessingUtils.generateTempFilename("raster.tif"),
+                                      grid,
+                                      first_raster.crs(),
+                                      RASTER_CALCULATOR_NO_DATA)
+
+    for row_start, row_end in grid.row_windows():
+
+        changed, nodata = difference_mask(read_block_with_halo(first_raster, grid, row_start, row_end),
+                                          read_block_with_halo(second_raster, grid, row_start, row_end),
+                                          grid.cell_size_x,
+                                          grid.cell_size_y)
+
+        result = changed * float(value)
+        result[nodata] = np.nan
+
+        raster_writer.write(row_start, result)
 
-    result = processing.run("native:slope",
-                            {'INPUT': first_raster,
-                             'Z_FACTOR': 1,
-                             'OUTPUT': 'TEMPORARY_OUTPUT'})
-
-    first_raster_slope = QgsRasterLayer(result["OUTPUT"])
-
-    result = processing.run("native:slope",
-                            {'INPUT': second_raster,
-                             'Z_FACTOR': 1,
-                             'OUTPUT': 'TEMPORARY_OUTPUT'})
-
-    second_raster_slope = QgsRasterLayer(result["OUTPUT"])
-
-    first_raster_entry = QgsRasterCalculatorEntry()
-    first_raster_entry.ref = 'first_raster_entry@1'
-    first_raster_entry.raster = first_raster
-    first_raster_entry.bandNumber = 1
-
-    second_raster_entry = QgsRasterCalculatorEntry()
-    second_raster_entry.ref = 'second_raster_entry@1'
-    second_raster_entry.raster = second_raster
-    second_raster_entry.bandNumber = 1
-
-    first_raster_slope_entry = QgsRasterCalculatorEntry()
-    first_raster_slope_entry.ref = 'first_raster_slope_entry@1'
-    first_raster_slope_entry.raster = first_raster_slope
-    first_raster_slope_entry.bandNumber = 1
-
-    second_raster_slope_entry = QgsRasterCalculatorEntry()
-    second_raster_slope_entry.ref = 'second_raster_slope_entry@1'
-    second_raster_slope_entry.raster = second_raster_slope
-    second_raster_slope_entry.bandNumber = 1
-
-    raster_entries = [first_raster_entry,
-                      second_raster_entry,
-                      first_raster_slope_entry,
-                      second_raster_slope_entry]
-
-    expression = f"(" \
-                 f"(0 < abs({first_raster_entry.ref} - {second_raster_entry.ref})) OR " \
-                 f"(0 < abs({first_raster_slope_entry.ref} - {second_raster_slope_entry.ref}))" \
-                 f") * {value}"
-
-    extent = first_raster.extent()
-    output_raster_filename = QgsProcessingUtils.generateTempFilename("raster.tif")
-
-    calc = QgsRasterCalculator(
-        expression,
-        output_raster_filename,
-        GdalUtils.getFormatShortNameFromFilename(output_raster_filename),
-        extent,
-        first_raster.crs(),
-        int(extent.width()),
-        int(extent.height()),
-        raster_entries,
-        QgsCoordinateTransformContext()
-    )
-
-    calc.processCalculation()
-
-    return QgsRasterLayer(output_raster_filename)
\ No newline at end of file
+    return raster_writer.close()
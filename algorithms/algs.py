@@ -1,6 +1,8 @@
-from typing import Tuple, Dict, NoReturn, Union, List, Any
+from typing import Tuple, Dict, NoReturn, Union, List, Any, Iterable
 import math
 
+import numpy as np
+
 from qgis.PyQt.QtCore import QVariant
 from qgis.PyQt import QtWidgets
 
@@ -13,21 +15,36 @@ from qgis.core import (QgsVectorLayer,
                        QgsRasterDataProvider,
                        NULL,
                        edit,
-                       QgsFeatureRequest,
+                       QgsExpression,
                        QgsMessageLog,
                        QgsProcessingException,
                        Qgis)
 
 from qgis.gui import QgsErrorDialog
 
-from qgis import processing
-
 from .utils import recode_2_ascii
 from ..classes.catalog import E3dCatalog
-from ..classes.class_KA5 import KA5Class
+from .ka5_classifier import KA5Classifier
 from ..classes.definition_landuse_crop import LanduseCrop
 from ..constants import TextConstants
-from ..algorithms.utils import log
+from ..algorithms.utils import log, ThrottledProgressBar, iterate_in_chunks, attribute_request
+from .ascii_grid import AsciiGridWriter, PRECISION_FLOAT32, PRECISION_FLOAT64
+from .raster_blocks import RasterGrid, raster_blocks
+from .garbrecht_roughness import (garbrecht_roughness,
+                                  fractions_from_features,
+                                  nan_to_none,
+                                  FEATURES_CHUNK_SIZE)
+
+ATTRIBUTE_CHANGES_CHUNK_SIZE = 50000
+
+# `gdal:translate` data type codes: (integer values, significant digits of float values)
+ASC_DATA_TYPES = {1: (True, PRECISION_FLOAT32),
+                  2: (True, PRECISION_FLOAT32),
+                  3: (True, PRECISION_FLOAT32),
+                  4: (True, PRECISION_FLOAT32),
+                  5: (True, PRECISION_FLOAT32),
+                  6: (False, PRECISION_FLOAT32),
+                  7: (False, PRECISION_FLOAT64)}
 
 
 def validate_KA5(layer_input: QgsVectorLayer,
@@ -67,23 +84,13 @@ def classify_KA5(layer_input: QgsVectorLayer,
 
     total = layer_input.dataProvider().featureCount() if layer_input.dataProvider().featureCount() else 0
 
-    progress_bar.setMaximum(total)
-
-    layer_input.startEditing()
+    progress = ThrottledProgressBar(progress_bar, total)
 
     dp_input: QgsVectorDataProvider = layer_input.dataProvider()
 
-    fields_to_delete = [fieldname_ka5_code, fieldname_ka5_name, fieldname_ka5_id, TextConstants.field_name_ka5_group_lv2_id, TextConstants.field_name_ka5_group_lv1_id]
-
-    for field_to_delete in fields_to_delete:
-
-        index = layer_input.fields().lookupField(field_to_delete)
-
-        if index != -1:
-
-            layer_input.deleteAttribute(index)
-
-    layer_input.updateFields()
+    delete_fields(layer_input,
+                  [fieldname_ka5_code, fieldname_ka5_name, fieldname_ka5_id,
+                   TextConstants.field_name_ka5_group_lv2_id, TextConstants.field_name_ka5_group_lv1_id])
 
     add_fields = QgsFields()
     add_fields.append(QgsField(fieldname_ka5_code, QVariant.String))
@@ -96,7 +103,7 @@ def classify_KA5(layer_input: QgsVectorLayer,
 
     layer_input.updateFields()
 
-    ka5_table = E3dCatalog().get_KA5_table()
+    classifier = KA5Classifier(E3dCatalog().get_KA5_table())
 
     feature: QgsFeature
 
@@ -104,7 +111,14 @@ def classify_KA5(layer_input: QgsVectorLayer,
                            fieldname_FU, fieldname_MU, fieldname_GU,
                            fieldname_FS, fieldname_MS, fieldname_GS]
 
-    for number, feature in enumerate(layer_input.getFeatures()):
+    fraction_indices = [layer_input.fields().lookupField(field_name) for field_name in validate_attributes]
+
+    feature_ids = []
+    fractions = []
+
+    request = attribute_request(layer_input.fields(), validate_attributes)
+
+    for number, feature in enumerate(layer_input.getFeatures(request)):
 
         try:
             feature_not_null(feature, validate_attributes, algorithm_name="classify_KA5")
@@ -112,59 +126,41 @@ def classify_KA5(layer_input: QgsVectorLayer,
             QgsMessageLog.logMessage(str(e), TextConstants.plugin_name, Qgis.Critical)
             continue
 
-        feature_data = KA5Class(None, None, None, None, None,
-                                float(feature.attribute(fieldname_FT)),
-                                float(feature.attribute(fieldname_MT)),
-                                float(feature.attribute(fieldname_GT)),
-                                float(feature.attribute(fieldname_FU)),
-                                float(feature.attribute(fieldname_MU)),
-                                float(feature.attribute(fieldname_GU)),
-                                float(feature.attribute(fieldname_FS)),
-                                float(feature.attribute(fieldname_MS)),
-                                float(feature.attribute(fieldname_GS)))
-
-        min_rmse = math.inf
-        min_rmse_code = None
-        min_rmse_name = None
-        min_rmse_id = None
-        min_rmse_ka5_group_lv2 = None
-        min_rmse_ka5_group_lv1 = None
-
-        for ka5_cat in ka5_table:
-
-            rmse = ka5_cat.RMSE(feature_data)
-
-            if rmse < min_rmse:
-                min_rmse = rmse
-                min_rmse_code = ka5_cat.code
-                min_rmse_name = ka5_cat.name
-                min_rmse_id = ka5_cat.id
-                min_rmse_ka5_group_lv2 = ka5_cat.group_lv2_id
-                min_rmse_ka5_group_lv1 = ka5_cat.group_lv1_id
+        feature_ids.append(feature.id())
+        attributes = feature.attributes()
+        fractions.append([float(attributes[index]) for index in fraction_indices])
 
-        layer_input.changeAttributeValue(feature.id(),
-                                         feature.fieldNameIndex(fieldname_ka5_name),
-                                         min_rmse_name)
+        progress.set_value(number)
 
-        layer_input.changeAttributeValue(feature.id(),
-                                         feature.fieldNameIndex(fieldname_ka5_code),
-                                         min_rmse_code)
+    ka5_indices = classifier.classify(np.array(fractions, dtype=np.float64).reshape(-1, len(validate_attributes)))
 
-        layer_input.changeAttributeValue(feature.id(),
-                                         feature.fieldNameIndex(fieldname_ka5_id),
-                                         min_rmse_id)
+    log(classifier.cache_statistics())
 
-        layer_input.changeAttributeValue(feature.id(),
-                                         feature.fieldNameIndex(TextConstants.field_name_ka5_group_lv2_id),
-                                         min_rmse_ka5_group_lv2)
+    index_ka5_name = dp_input.fieldNameIndex(fieldname_ka5_name)
+    index_ka5_code = dp_input.fieldNameIndex(fieldname_ka5_code)
+    index_ka5_id = dp_input.fieldNameIndex(fieldname_ka5_id)
+    index_ka5_group_lv2 = dp_input.fieldNameIndex(TextConstants.field_name_ka5_group_lv2_id)
+    index_ka5_group_lv1 = dp_input.fieldNameIndex(TextConstants.field_name_ka5_group_lv1_id)
 
-        layer_input.changeAttributeValue(feature.id(),
-                                         feature.fieldNameIndex(TextConstants.field_name_ka5_group_lv1_id),
-                                         min_rmse_ka5_group_lv1)
+    attribute_changes = {}
 
-        progress_bar.setValue(int(number))
+    for feature_id, ka5_index in zip(feature_ids, ka5_indices):
 
-    layer_input.commitChanges()
+        ka5_cat = classifier.ka5_class(int(ka5_index))
+
+        if ka5_cat:
+            attribute_changes[feature_id] = {index_ka5_name: ka5_cat.name,
+                                             index_ka5_code: ka5_cat.code,
+                                             index_ka5_id: ka5_cat.id,
+                                             index_ka5_group_lv2: ka5_cat.group_lv2_id,
+                                             index_ka5_group_lv1: ka5_cat.group_lv1_id}
+        else:
+            attribute_changes[feature_id] = dict.fromkeys([index_ka5_name, index_ka5_code, index_ka5_id,
+                                                           index_ka5_group_lv2, index_ka5_group_lv1])
+
+    change_attribute_values(layer_input, attribute_changes)
+
+    progress.finish()
 
     return True, ""
 
@@ -201,26 +197,11 @@ def calculate_garbrecht_roughness(layer_input: QgsVectorLayer,
         if fields.lookupField(frac_code) == -1:
             return False, "Field `{}` could not be found in the layer, but it is required.".format(frac_code)
 
-    # dictionary of the fractions classes codes and particle diameter of top and bottom bodred value
-    top = "top"
-    bot = "bottom"
-    fractions = {FTcode: {bot: 0.0, top: 0.0002},
-                 MTcode: {bot: 0.0002, top: 0.00063},
-                 GTcode: {bot: 0.00063, top: 0.002},
-                 FUcode: {bot: 0.002, top: 0.0063},
-                 MUcode: {bot: 0.0063, top: 0.02},
-                 GUcode: {bot: 0.02, top: 0.063},
-                 FScode: {bot: 0.063, top: 0.2},
-                 MScode: {bot: 0.2, top: 0.63},
-                 GScode: {bot: 0.63, top: 2.0}}
+    fraction_indices = [fields.lookupField(frac_code) for frac_code in fractionCodes]
 
     total = layer_input.dataProvider().featureCount() if layer_input.dataProvider().featureCount() else 0
 
-    progress_bar.setMaximum(total)
-
-    layer_input.startEditing()
-
-    feature_polygon: QgsFeature
+    progress = ThrottledProgressBar(progress_bar, total)
 
     dp_input: QgsVectorDataProvider = layer_input.dataProvider()
 
@@ -234,57 +215,33 @@ def calculate_garbrecht_roughness(layer_input: QgsVectorLayer,
 
     layer_input.updateFields()
 
-    feature: QgsFeature
-
-    for number, feature in enumerate(layer_input.getFeatures()):
-
-        FTc = feature.attribute(fractionCodes[0])
-        MTc = FTc + feature.attribute(fractionCodes[1])
-        GTc = MTc + feature.attribute(fractionCodes[2])
-        FUc = GTc + feature.attribute(fractionCodes[3])
-        MUc = FUc + feature.attribute(fractionCodes[4])
-        GUc = MUc + feature.attribute(fractionCodes[5])
-        FSc = GUc + feature.attribute(fractionCodes[6])
-        MSc = FSc + feature.attribute(fractionCodes[7])
-        GSc = MSc + feature.attribute(fractionCodes[8])
+    index_d90 = dp_input.fieldNameIndex(field_name_d90)
+    index_gb = dp_input.fieldNameIndex(field_name_gb)
 
-        cumContents = {FTcode: FTc, MTcode: MTc, GTcode: GTc, FUcode: FUc, MUcode: MUc, GUcode: GUc, FScode: FSc,
-                       MScode: MSc, GScode: GSc}
+    request = attribute_request(fields, fractionCodes)
 
-        cumCont = 0
-        found = False
+    number = 0
 
-        for i in range(len(fractionCodes)):
+    for features in iterate_in_chunks(layer_input.getFeatures(request), FEATURES_CHUNK_SIZE):
 
-            cumCont = cumCont + feature.attribute(fractionCodes[i])
+        d90, n, _ = garbrecht_roughness(fractions_from_features(features, fraction_indices))
 
-            if cumCont >= 90 and not found:
-                upSize = fractions[fractionCodes[i]][top]
-                botSize = fractions[fractionCodes[i]][bot]
-                upClassIndex = fractionCodes[i]
-                botClassIndex = fractionCodes[i - 1]
-                upClassContent = cumContents[upClassIndex]
-                botClassContent = cumContents[botClassIndex]
+        attribute_changes = {}
 
-                found = True
+        for feature, d90_value, n_value in zip(features, nan_to_none(d90), nan_to_none(n)):
 
-        d90 = botSize + (upSize - botSize) / (upClassContent - botClassContent) * (90 - botClassContent)
+            attribute_changes[feature.id()] = {index_gb: n_value}
 
-        if add_d90:
-            layer_input.changeAttributeValue(feature.id(),
-                                             feature.fieldNameIndex(field_name_d90),
-                                             d90)
+            if add_d90:
+                attribute_changes[feature.id()][index_d90] = d90_value
 
-        exp = 1.0 / 6.0
-        n = (d90 ** exp) / 26.0
+        change_attribute_values(layer_input, attribute_changes)
 
-        layer_input.changeAttributeValue(feature.id(),
-                                         feature.fieldNameIndex(field_name_gb),
-                                         n)
+        number += len(features)
 
-        progress_bar.setValue(int(number))
+        progress.set_value(number)
 
-    layer_input.commitChanges()
+    progress.finish()
 
     return True, ""
 
@@ -326,7 +283,10 @@ def landuse_with_crops(layer_input: QgsVectorLayer,
 
     feature: QgsFeature
 
-    for number, feature in enumerate(layer_input.getFeatures()):
+    request = attribute_request(layer_input.fields(),
+                                [field_name for field_name in [fieldname_landuse, fieldname_crop] if field_name])
+
+    for number, feature in enumerate(layer_input.getFeatures(request)):
 
         result = feature.attribute(fieldname_landuse)
 
@@ -390,7 +350,9 @@ def add_fields_to_landuse(layer: QgsVectorLayer,
 
     feature: QgsFeature
 
-    for feature in layer.getFeatures():
+    request = attribute_request(layer.fields(), [TextConstants.field_name_landuse_crops])
+
+    for feature in layer.getFeatures(request):
 
         landuse_crop = feature.attribute(TextConstants.field_name_landuse_crops)
 
@@ -437,6 +399,34 @@ def delete_fields(layer: QgsVectorLayer,
         layer.updateFields()
 
 
+def change_attribute_values(layer: QgsVectorLayer,
+                            attribute_changes: Union[Dict[int, Dict[int, Any]], Iterable[Tuple[int, Dict[int, Any]]]],
+                            chunk_size: int = ATTRIBUTE_CHANGES_CHUNK_SIZE) -> NoReturn:
+    """
+    Writes `{feature_id: {field_index: value}}` map (or iterable of `(feature_id, {field_index: value})` pairs)
+    directly through the data provider in chunks, bypassing the edit buffer. Field indices are provider indices.
+    Falls back to edit session if the provider cannot change values.
+    """
+
+    layer_dp: QgsVectorDataProvider = layer.dataProvider()
+
+    if isinstance(attribute_changes, dict):
+        attribute_changes = attribute_changes.items()
+
+    if not layer_dp.capabilities() & QgsVectorDataProvider.ChangeAttributeValues:
+
+        with edit(layer):
+            for feature_id, attributes in attribute_changes:
+                layer.changeAttributeValues(feature_id, attributes)
+
+        return
+
+    for chunk in iterate_in_chunks(attribute_changes, chunk_size):
+        layer_dp.changeAttributeValues(dict(chunk))
+
+    layer.triggerRepaint()
+
+
 def add_field_with_constant_value(layer: QgsVectorLayer,
                                   fieldname: str,
                                   value: Any,
@@ -467,21 +457,11 @@ def add_field_with_constant_value(layer: QgsVectorLayer,
 
     layer.updateFields()
 
-    layer.startEditing()
-
-    feature: QgsFeature
-
     field_index = layer_dp.fieldNameIndex(fieldname)
 
     if not skip_value_insertion:
 
-        for feature in layer.getFeatures():
-
-            layer.changeAttributeValue(feature.id(),
-                                       field_index,
-                                       value)
-
-    layer.commitChanges()
+        change_attribute_values(layer, ((feature_id, {field_index: value}) for feature_id in layer.allFeatureIds()))
 
 
 def add_fid_field(layer: QgsVectorLayer) -> NoReturn:
@@ -498,19 +478,9 @@ def add_fid_field(layer: QgsVectorLayer) -> NoReturn:
 
     layer.updateFields()
 
-    layer.startEditing()
-
-    feature: QgsFeature
-
     field_index = layer_dp.fieldNameIndex(TextConstants.field_name_fid)
 
-    for feature in layer.getFeatures():
-
-        layer.changeAttributeValue(feature.id(),
-                                   field_index,
-                                   feature.id())
-
-    layer.commitChanges()
+    change_attribute_values(layer, ((feature_id, {field_index: feature_id}) for feature_id in layer.allFeatureIds()))
 
 
 def rename_field(layer: QgsVectorLayer,
@@ -540,24 +510,40 @@ def max_value_in_field(layer: QgsVectorLayer,
 def save_raster_as_asc(raster: QgsRasterLayer,
                        path: str,
                        out_type: int = 2) -> NoReturn:
+    """
+    Writes raster as ESRI ASCII grid, streamed block by block through `AsciiGridWriter`. `out_type` is data type code
+    of `gdal:translate` (0 keeps type of the raster), integer types are written as whole numbers, Float32 and Float64
+    with precision of the type. Nodata below -9999 is written as -9999.
+    """
 
     raster_data_provider: QgsRasterDataProvider = raster.dataProvider()
 
     no_data = raster_data_provider.sourceNoDataValue(1)
 
-    if no_data < -9999:
-        raster_data_provider.setNoDataValue(1, -9999)
+    if not raster_data_provider.sourceHasNoDataValue(1) or no_data < -9999:
         no_data = -9999
 
-    processing.run("gdal:translate", {
-        'INPUT': raster,
-        'TARGET_CRS': raster.crs(),
-        'NODATA': no_data,
-        'COPY_SUBDATASETS': False,
-        'OPTIONS': '',
-        'EXTRA': '',
-        'DATA_TYPE': out_type,
-        'OUTPUT': path})
+    if out_type == 0:
+        integer = raster_data_provider.dataType(1) not in [Qgis.Float32, Qgis.Float64]
+        precision = PRECISION_FLOAT64 if raster_data_provider.dataType(1) == Qgis.Float64 else PRECISION_FLOAT32
+    else:
+        integer, precision = ASC_DATA_TYPES[out_type]
+
+    grid = RasterGrid.from_layer(raster)
+
+    with AsciiGridWriter(path,
+                         grid.width,
+                         grid.height,
+                         grid.extent.xMinimum(),
+                         grid.extent.yMinimum(),
+                         grid.cell_size_x,
+                         no_data,
+                         integer=integer,
+                         precision=precision,
+                         cellsize_y=grid.cell_size_y) as writer:
+
+        for _, block in raster_blocks(raster, grid):
+            writer.write_rows(block)
 
 
 def add_row_without_geom(layer: QgsVectorLayer,
@@ -586,19 +572,36 @@ def delete_features_with_values(layer: QgsVectorLayer,
                                 field_name: str,
                                 field_values: List[int]) -> NoReturn:
 
-    feature: QgsFeature
+    """
+    Deletes features with value of `field_name` in `field_values`. Ids of all features are found in single scan with
+    `IN` expression and deleted by one call of the data provider.
+    """
 
-    for value in field_values:
+    if not field_values:
+        return
 
-        request = QgsFeatureRequest().setFilterExpression(f'"{field_name}" = {value}')
+    values = ", ".join([QgsExpression.quotedValue(value) for value in set(field_values)])
 
-        layer.startEditing()
+    request = attribute_request(layer.fields(), [field_name])
+    request.setFilterExpression(f"{QgsExpression.quotedColumnRef(field_name)} IN ({values})")
 
-        for feature in layer.getFeatures(request):
+    feature_ids = [feature.id() for feature in layer.getFeatures(request)]
 
-            layer.deleteFeature(feature.id())
+    if not feature_ids:
+        return
 
-        layer.commitChanges()
+    layer_dp: QgsVectorDataProvider = layer.dataProvider()
+
+    if not layer_dp.capabilities() & QgsVectorDataProvider.DeleteFeatures:
+
+        with edit(layer):
+            layer.deleteFeatures(feature_ids)
+
+        return
+
+    layer_dp.deleteFeatures(feature_ids)
+
+    layer.triggerRepaint()
 
 
 def field_contains_null_values(layer: QgsVectorLayer, field_name: str) -> bool:
@@ -610,81 +613,80 @@ def field_contains_null_values(layer: QgsVectorLayer, field_name: str) -> bool:
 
 def adjust_feature_values_to_settings(layer: QgsVectorLayer,
                                       settings: Dict[str, str]) -> NoReturn:
-
-    feature: QgsFeature
+    """
+    Applies KA5 settings `{landuse_crop: menu status}` to features. Fields cleared by every status are resolved once,
+    so each feature costs one lookup of its landuse_crop. For `menu_status_ka5_nodifferentiate` the first feature of
+    landuse_crop is representative and its soil values are copied to following features of the same landuse_crop.
+    All changes are written in one bulk update.
+    """
 
     fields: QgsFields = layer.fields()
+    layer_dp: QgsVectorDataProvider = layer.dataProvider()
 
-    remove_soil_classes = {}
-
-    layer.startEditing()
-
-    for feature in layer.getFeatures():
-
-        for setting in settings.keys():
-
-            if setting == feature.attribute(TextConstants.field_name_landuse_crops):
+    index_ka5_group_lv1 = layer_dp.fieldNameIndex(TextConstants.field_name_ka5_group_lv1_id)
+    index_ka5_group_lv2 = layer_dp.fieldNameIndex(TextConstants.field_name_ka5_group_lv2_id)
 
-                if settings[setting] == TextConstants.menu_status_ka5:
+    cleared_fields = {TextConstants.menu_status_ka5: [index_ka5_group_lv1, index_ka5_group_lv2],
+                      TextConstants.menu_status_ka5_lv1: [index_ka5_group_lv2],
+                      TextConstants.menu_status_ka5_lv2: [index_ka5_group_lv1],
+                      TextConstants.menu_status_ka5_nodifferentiate: [index_ka5_group_lv1, index_ka5_group_lv2]}
 
-                    field_index_1 = fields.lookupField(TextConstants.field_name_ka5_group_lv1_id)
-                    field_index_2 = fields.lookupField(TextConstants.field_name_ka5_group_lv2_id)
+    actions = {landuse_crop: [index for index in cleared_fields.get(status, []) if index != -1]
+               for landuse_crop, status in settings.items()}
 
-                    layer.changeAttributeValue(feature.id(),
-                                               field_index_1,
-                                               None)
+    unified_landuse_crops = {landuse_crop for landuse_crop, status in settings.items()
+                             if status == TextConstants.menu_status_ka5_nodifferentiate}
 
-                    layer.changeAttributeValue(feature.id(),
-                                               field_index_2,
-                                               None)
+    # pairs of (index in layer attributes, provider index) of soil fields copied from representative feature
+    unify_fields = [(fields.lookupField(field_name), layer_dp.fieldNameIndex(field_name))
+                    for field_name in [TextConstants.field_name_ka5_id,
+                                       TextConstants.field_name_ka5_name,
+                                       TextConstants.field_name_ka5_code,
+                                       TextConstants.field_name_soil_id]]
 
-                if settings[setting] == TextConstants.menu_status_ka5_lv1:
+    unify_fields = [(index, index_dp) for index, index_dp in unify_fields if index != -1 and index_dp != -1]
 
-                    field_index_2 = fields.lookupField(TextConstants.field_name_ka5_group_lv2_id)
+    index_landuse_crops = fields.lookupField(TextConstants.field_name_landuse_crops)
 
-                    layer.changeAttributeValue(feature.id(),
-                                               field_index_2,
-                                               None)
+    if index_landuse_crops == -1:
+        return
 
-                if settings[setting] == TextConstants.menu_status_ka5_lv2:
+    request = attribute_request(fields,
+                                [TextConstants.field_name_landuse_crops,
+                                 TextConstants.field_name_ka5_id,
+                                 TextConstants.field_name_ka5_name,
+                                 TextConstants.field_name_ka5_code,
+                                 TextConstants.field_name_soil_id])
 
-                    field_index_1 = fields.lookupField(TextConstants.field_name_ka5_group_lv1_id)
+    representative_values: Dict[str, List[Any]] = {}
 
-                    layer.changeAttributeValue(feature.id(),
-                                               field_index_1,
-                                               None)
+    attribute_changes: Dict[int, Dict[int, Any]] = {}
 
-                if settings[setting] == TextConstants.menu_status_ka5_nodifferentiate:
+    feature: QgsFeature
 
-                    field_index_1 = fields.lookupField(TextConstants.field_name_ka5_group_lv1_id)
-                    field_index_2 = fields.lookupField(TextConstants.field_name_ka5_group_lv2_id)
+    for feature in layer.getFeatures(request):
 
-                    layer.changeAttributeValue(feature.id(),
-                                               field_index_1,
-                                               None)
+        attributes = feature.attributes()
 
-                    layer.changeAttributeValue(feature.id(),
-                                               field_index_2,
-                                               None)
+        landuse_crop = attributes[index_landuse_crops]
 
-                    landuse_crop = feature.attribute(TextConstants.field_name_landuse_crops)
+        if landuse_crop == NULL or landuse_crop not in actions:
+            continue
 
-                    if landuse_crop in remove_soil_classes.keys():
+        changes = {index: None for index in actions[landuse_crop]}
 
-                        fields_to_unify = {fields.lookupField(TextConstants.field_name_ka5_id): TextConstants.field_name_ka5_id,
-                                           fields.lookupField(TextConstants.field_name_ka5_name): TextConstants.field_name_ka5_name,
-                                           fields.lookupField(TextConstants.field_name_ka5_code): TextConstants.field_name_ka5_code,
-                                           fields.lookupField(TextConstants.field_name_soil_id): TextConstants.field_name_soil_id}
+        if landuse_crop in unified_landuse_crops:
 
-                        for field_index in fields_to_unify.keys():
+            if landuse_crop in representative_values:
 
-                            layer.changeAttributeValue(feature.id(),
-                                                       field_index,
-                                                       remove_soil_classes[landuse_crop].attribute(fields_to_unify[field_index]))
+                for (_, index_dp), value in zip(unify_fields, representative_values[landuse_crop]):
+                    changes[index_dp] = value
 
-                    else:
+            else:
 
-                        remove_soil_classes.update({landuse_crop: feature})
+                representative_values[landuse_crop] = [attributes[index] for index, _ in unify_fields]
 
-    layer.commitChanges()
+        if changes:
+            attribute_changes[feature.id()] = changes
 
+    change_attribute_values(layer, attribute_changes)
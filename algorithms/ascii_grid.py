@@ -0,0 +1,130 @@
+from typing import Optional, TextIO
+
+import numpy as np
+
+# size of write buffer of the output file
+BUFFER_SIZE = 16 * 1024 * 1024
+
+# number of cells formatted by single string formatting call
+FORMAT_CELLS = 1000000
+
+# significant digits of float values, float32 needs 9 to be read back as the same number, float64 uses 15 digits
+# (`%.15g`) that read back exactly for decimal values and keep the size of the grid close to the gdal:translate output
+PRECISION_FLOAT32 = 9
+PRECISION_FLOAT64 = 15
+
+
+class AsciiGridWriter:
+    """
+    Writes ESRI ASCII grid (`.asc`) row block by row block, so the whole raster never needs to be in memory.
+
+    Header is written on opening, rows have to be passed top to bottom as 2D arrays with `ncols` columns. NaN values
+    are written as `nodata`. Integer grids are rounded to whole numbers, float grids are written with `precision`
+    significant digits. Rows are formatted by one `%` formatting of a prepared row template for many rows at once
+    and written through large file buffer.
+    """
+
+    def __init__(self,
+                 path: str,
+                 ncols: int,
+                 nrows: int,
+                 xllcorner: float,
+                 yllcorner: float,
+                 cellsize: float,
+                 nodata: float,
+                 integer: bool = False,
+                 precision: int = PRECISION_FLOAT32,
+                 cellsize_y: Optional[float] = None):
+
+        self.path = path
+
+        self.ncols = ncols
+        self.nrows = nrows
+        self.xllcorner = xllcorner
+        self.yllcorner = yllcorner
+        self.cellsize = cellsize
+        self.cellsize_y = cellsize_y
+        self.nodata = nodata
+        self.integer = integer
+        self.precision = precision
+
+        self.value_format = "%d" if integer else f"%.{precision}g"
+
+        self.row_format = " ".join([self.value_format] * ncols) + "\n"
+
+        self.format_rows = max(1, FORMAT_CELLS // max(ncols, 1))
+
+        self.rows_written = 0
+
+        self.file: Optional[TextIO] = None
+
+    def __enter__(self):
+
+        self.open()
+
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+
+        self.close()
+
+    def header(self) -> str:
+
+        if self.cellsize_y is None or self.cellsize_y == self.cellsize:
+            cellsize = f"cellsize     {self.cellsize:.12g}\n"
+        else:
+            cellsize = f"dx           {self.cellsize:.12g}\n" \
+                       f"dy           {self.cellsize_y:.12g}\n"
+
+        return f"ncols        {self.ncols}\n" \
+               f"nrows        {self.nrows}\n" \
+               f"xllcorner    {self.xllcorner:.12g}\n" \
+               f"yllcorner    {self.yllcorner:.12g}\n" \
+               f"{cellsize}" \
+               f"NODATA_value {self.format_value(self.nodata)}\n"
+
+    def open(self):
+
+        self.file = open(self.path, "w", encoding="ascii", newline="\n", buffering=BUFFER_SIZE)
+
+        self.file.write(self.header())
+
+    def close(self):
+
+        if self.file:
+            self.file.close()
+            self.file = None
+
+    def format_value(self, value: float) -> str:
+
+        return self.value_format % (round(value) if self.integer else value)
+
+    def format_rows_text(self, rows: np.ndarray) -> str:
+        """
+        Text of `rows` (2D array with `ncols` columns, NaN as nodata) in ASCII grid format.
+        """
+
+        rows = np.asarray(rows, dtype=np.float64).reshape(-1, self.ncols)
+
+        rows = np.where(np.isnan(rows), self.nodata, rows)
+
+        if self.integer:
+            rows = np.rint(rows).astype(np.int64)
+
+        texts = []
+
+        for start in range(0, rows.shape[0], self.format_rows):
+
+            part = rows[start:start + self.format_rows]
+
+            texts.append((self.row_format * part.shape[0]) % tuple(part.ravel().tolist()))
+
+        return "".join(texts)
+
+    def write_rows(self, rows: np.ndarray):
+
+        rows = np.asarray(rows).reshape(-1, self.ncols)
+
+        self.file.write(self.format_rows_text(rows))
+
+        self.rows_written += rows.shape[0]
@@ -0,0 +1,133 @@
+from typing import Tuple, List
+
+import numpy as np
+
+from qgis.core import (QgsFeature,
+                       NULL)
+
+# particle diameter [mm] of bottom and top border of fractions FT, MT, GT, FU, MU, GU, FS, MS, GS
+FRACTIONS_BOTTOM = np.array([0.0, 0.0002, 0.00063, 0.002, 0.0063, 0.02, 0.063, 0.2, 0.63])
+FRACTIONS_TOP = np.array([0.0002, 0.00063, 0.002, 0.0063, 0.02, 0.063, 0.2, 0.63, 2.0])
+
+D90_PERCENTILE = 90
+
+FEATURES_CHUNK_SIZE = 10000
+
+
+def garbrecht_roughness(fractions: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Calculates d90 and Garbrecht's roughness n for (N, 9) array of fraction contents (FT, MT, GT, FU, MU, GU, FS, MS,
+    GS) in percent. Returns arrays `d90`, `n` and index of fraction in which d90 lies. Rows where cumulative content
+    never reaches 90 % (or that contain NaN) get NaN values and fraction index -1.
+    """
+
+    fractions = np.asarray(fractions, dtype=np.float64).reshape(-1, len(FRACTIONS_TOP))
+
+    cumulative = np.cumsum(fractions, axis=1)
+
+    reached = D90_PERCENTILE <= cumulative
+
+    found = reached.any(axis=1)
+
+    # first fraction where cumulative content reaches 90 %
+    up_index = np.argmax(reached, axis=1)
+    # as in the original per feature algorithm, class before first fraction is the last one
+    bot_index = (up_index - 1) % len(FRACTIONS_TOP)
+
+    rows = np.arange(fractions.shape[0])
+
+    up_size = FRACTIONS_TOP[up_index]
+    bot_size = FRACTIONS_BOTTOM[up_index]
+    up_content = cumulative[rows, up_index]
+    bot_content = cumulative[rows, bot_index]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+
+        d90 = bot_size + (up_size - bot_size) / (up_content - bot_content) * (D90_PERCENTILE - bot_content)
+
+        n = (d90 ** (1.0 / 6.0)) / 26.0
+
+    d90[~found] = np.nan
+    n[~found] = np.nan
+
+    return d90, n, np.where(found, up_index, -1)
+
+
+def fractions_from_features(features: List[QgsFeature],
+                            field_indices: List[int]) -> np.ndarray:
+    """
+    Reads fraction contents from `features` into (N, 9) array, NULL values become NaN.
+    """
+
+    data = np.full((len(features), len(field_indices)), np.nan, dtype=np.float64)
+
+    for row, feature in enumerate(features):
+
+        attributes = feature.attributes()
+
+        for column, field_index in enumerate(field_indices):
+
+            value = attributes[field_index]
+
+            if value != NULL:
+                data[row, column] = value
+
+    return data
+
+
+def nan_to_none(values: np.ndarray) -> List:
+
+    return [None if np.isnan(value) else value for value in values.tolist()]
+
+
+class GarbrechtRoughnessSummary:
+    """
+    Aggregates results of `garbrecht_roughness` over chunks - count of features per d90 fraction bracket and
+    min, max and mean of n - so that the result can be reported without per feature messages.
+    """
+
+    FRACTIONS = ["FT", "MT", "GT", "FU", "MU", "GU", "FS", "MS", "GS"]
+
+    def __init__(self):
+
+        self.bracket_counts = np.zeros(len(self.FRACTIONS), dtype=np.int64)
+        self.not_found = 0
+
+        self.n_count = 0
+        self.n_sum = 0.0
+        self.n_min = np.inf
+        self.n_max = -np.inf
+
+    def update(self, n: np.ndarray, fraction_index: np.ndarray) -> None:
+
+        found = fraction_index != -1
+
+        self.bracket_counts += np.bincount(fraction_index[found], minlength=len(self.FRACTIONS))
+        self.not_found += int(np.count_nonzero(~found))
+
+        n = n[np.isfinite(n)]
+
+        if n.size:
+            self.n_count += n.size
+            self.n_sum += float(n.sum())
+            self.n_min = min(self.n_min, float(n.min()))
+            self.n_max = max(self.n_max, float(n.max()))
+
+    def messages(self, fraction_names: List[str] = None) -> List[str]:
+
+        if fraction_names is None:
+            fraction_names = self.FRACTIONS
+
+        messages = []
+
+        for fraction_name, count in zip(fraction_names, self.bracket_counts.tolist()):
+            messages.append(f"d90 in fraction {fraction_name}: {count} features")
+
+        messages.append(f"d90 not found (cumulative content below {D90_PERCENTILE} %): {self.not_found} features")
+
+        if self.n_count:
+            messages.append(f"n: min {self.n_min}, max {self.n_max}, mean {self.n_sum / self.n_count}")
+        else:
+            messages.append("n: no values calculated")
+
+        return messages
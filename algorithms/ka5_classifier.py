@@ -0,0 +1,148 @@
+from typing import List, Optional, Dict, Tuple
+
+import numpy as np
+
+from ..classes.class_KA5 import KA5Class
+
+
+class KA5Classifier:
+    """
+    Vectorized nearest KA5 class search.
+
+    Fractions are expected as (N, 9) array with columns in order FT, MT, GT, FU, MU, GU, FS, MS, GS. The distance
+    is the same masked RMSE as `KA5Class.RMSE` (including double weighting of FT), the nearest class is the first
+    class with minimal RMSE, so the result is identical to looping over the catalog with `KA5Class.RMSE`.
+
+    Results are memoized on fraction vector rounded to `cache_decimals`, so every distinct soil composition is
+    classified only once. `cache_hits` and `cache_misses` count features served from cache and classified compositions.
+    """
+
+    FRACTIONS = ["FT", "MT", "GT", "FU", "MU", "GU", "FS", "MS", "GS"]
+
+    # order of terms in KA5Class.RMSE, first three are always used, the rest only if feature value is not 0
+    TERMS_ALWAYS = [1, 4, 7]
+    TERMS_MASKED = [0, 2, 3, 5, 0, 6, 8]
+
+    NOT_CLASSIFIED = -1
+
+    def __init__(self,
+                 ka5_table: List[KA5Class],
+                 chunk_size: int = 8192,
+                 use_cache: bool = True,
+                 cache_decimals: int = 6):
+
+        self.ka5_table = ka5_table
+
+        self.chunk_size = chunk_size
+
+        self.use_cache = use_cache
+        self.cache_decimals = cache_decimals
+        self.cache: Dict[Tuple[float, ...], int] = {}
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+        self.catalog = np.array([[getattr(ka5_class, fraction) for fraction in self.FRACTIONS]
+                                 for ka5_class in ka5_table],
+                                dtype=np.float64).reshape(-1, len(self.FRACTIONS))
+
+    def ka5_class(self, index: int) -> Optional[KA5Class]:
+
+        if index == self.NOT_CLASSIFIED:
+            return None
+
+        return self.ka5_table[index]
+
+    def rmse(self, fractions: np.ndarray) -> np.ndarray:
+
+        fractions = np.asarray(fractions, dtype=np.float64).reshape(-1, len(self.FRACTIONS))
+
+        mse = np.zeros((fractions.shape[0], self.catalog.shape[0]), dtype=np.float64)
+        count = np.full((fractions.shape[0], 1), len(self.TERMS_ALWAYS), dtype=np.float64)
+
+        for column in self.TERMS_ALWAYS:
+            mse += np.square(self.catalog[:, column][np.newaxis, :] - fractions[:, column][:, np.newaxis])
+
+        for column in self.TERMS_MASKED:
+            mask = (fractions[:, column] != 0)[:, np.newaxis]
+            term = np.square(self.catalog[:, column][np.newaxis, :] - fractions[:, column][:, np.newaxis])
+            mse += np.where(mask, term, 0.0)
+            count += mask
+
+        return np.sqrt(mse / count)
+
+    def classify(self, fractions: np.ndarray) -> np.ndarray:
+        """
+        Returns index of nearest class in `ka5_table` for every row of `fractions`, or `NOT_CLASSIFIED` if no class
+        has finite RMSE.
+        """
+
+        fractions = np.asarray(fractions, dtype=np.float64).reshape(-1, len(self.FRACTIONS))
+
+        if not self.use_cache or fractions.shape[0] == 0:
+            return self.classify_uncached(fractions)
+
+        # adding 0.0 turns -0.0 into 0.0, so both end up under the same key
+        keys = np.round(fractions, self.cache_decimals) + 0.0
+
+        unique_keys, first_rows, inverse = np.unique(keys, axis=0, return_index=True, return_inverse=True)
+
+        unique_keys = [tuple(key) for key in unique_keys.tolist()]
+
+        unique_result = np.empty(len(unique_keys), dtype=np.int64)
+
+        missing = []
+
+        for i, key in enumerate(unique_keys):
+
+            cached = self.cache.get(key)
+
+            if cached is None:
+                missing.append(i)
+            else:
+                unique_result[i] = cached
+
+        if missing:
+
+            missing = np.array(missing, dtype=np.int64)
+
+            unique_result[missing] = self.classify_uncached(fractions[first_rows[missing]])
+
+            for i in missing.tolist():
+                self.cache[unique_keys[i]] = int(unique_result[i])
+
+        self.cache_misses += len(missing)
+        self.cache_hits += fractions.shape[0] - len(missing)
+
+        return unique_result[inverse.reshape(-1)]
+
+    def cache_statistics(self) -> str:
+
+        total = self.cache_hits + self.cache_misses
+
+        hit_ratio = self.cache_hits / total * 100 if total else 0
+
+        return f"KA5 classification cache: {self.cache_hits} hits, {self.cache_misses} misses " \
+               f"({hit_ratio:.1f} % of features served from cache)."
+
+    def classify_uncached(self, fractions: np.ndarray) -> np.ndarray:
+
+        fractions = np.asarray(fractions, dtype=np.float64).reshape(-1, len(self.FRACTIONS))
+
+        result = np.full(fractions.shape[0], self.NOT_CLASSIFIED, dtype=np.int64)
+
+        if self.catalog.shape[0] == 0:
+            return result
+
+        for start in range(0, fractions.shape[0], self.chunk_size):
+
+            rmse = self.rmse(fractions[start:start + self.chunk_size])
+
+            rmse[np.isnan(rmse)] = np.inf
+
+            nearest = np.argmin(rmse, axis=1)
+
+            found = np.isfinite(rmse[np.arange(rmse.shape[0]), nearest])
+
+            result[start:start + self.chunk_size] = np.where(found, nearest, self.NOT_CLASSIFIED)
+
+        return result
@@ -0,0 +1,165 @@
+from typing import Iterator, Tuple, Optional
+
+import numpy as np
+
+from qgis.PyQt.QtCore import QByteArray
+
+from qgis.core import (QgsRasterLayer,
+                       QgsRasterDataProvider,
+                       QgsRasterFileWriter,
+                       QgsRasterBlock,
+                       QgsRectangle,
+                       QgsCoordinateReferenceSystem,
+                       Qgis)
+
+BLOCK_ROWS = 512
+
+NUMPY_DATA_TYPES = {Qgis.Byte: np.uint8,
+                    Qgis.UInt16: np.uint16,
+                    Qgis.Int16: np.int16,
+                    Qgis.UInt32: np.uint32,
+                    Qgis.Int32: np.int32,
+                    Qgis.Float32: np.float32,
+                    Qgis.Float64: np.float64}
+
+
+class RasterGrid:
+    """
+    Grid of a raster layer (extent and size in cells) used to read other rasters block by block on the same cells.
+    """
+
+    def __init__(self,
+                 extent: QgsRectangle,
+                 width: int,
+                 height: int):
+
+        self.extent = extent
+        self.width = width
+        self.height = height
+
+        self.cell_size_x = extent.width() / width
+        self.cell_size_y = extent.height() / height
+
+    @classmethod
+    def from_layer(cls, raster: QgsRasterLayer) -> "RasterGrid":
+
+        return cls(raster.extent(), raster.width(), raster.height())
+
+    def rows_extent(self, row_start: int, row_end: int) -> QgsRectangle:
+
+        return QgsRectangle(self.extent.xMinimum(),
+                            self.extent.yMaximum() - row_end * self.cell_size_y,
+                            self.extent.xMaximum(),
+                            self.extent.yMaximum() - row_start * self.cell_size_y)
+
+    def row_windows(self, block_rows: int = BLOCK_ROWS) -> Iterator[Tuple[int, int]]:
+
+        for row_start in range(0, self.height, block_rows):
+            yield row_start, min(row_start + block_rows, self.height)
+
+
+def read_block(raster: QgsRasterLayer,
+               grid: RasterGrid,
+               row_start: int,
+               row_end: int,
+               band: int = 1) -> np.ndarray:
+    """
+    Reads rows `row_start:row_end` of `grid` from `raster` as float64 array, nodata cells are NaN.
+    """
+
+    provider: QgsRasterDataProvider = raster.dataProvider()
+
+    rows = row_end - row_start
+
+    block: QgsRasterBlock = provider.block(band, grid.rows_extent(row_start, row_end), grid.width, rows)
+
+    data_type = NUMPY_DATA_TYPES[block.dataType()]
+
+    raw_values = np.frombuffer(bytes(block.data()), dtype=data_type).reshape(rows, grid.width)
+
+    values = raw_values.astype(np.float64)
+
+    if block.hasNoDataValue():
+        # compared in data type of the raster, float32 nodata can differ from the double returned by QGIS
+        values[raw_values == np.array(block.noDataValue()).astype(data_type)] = np.nan
+
+    return values
+
+
+def read_block_with_halo(raster: QgsRasterLayer,
+                         grid: RasterGrid,
+                         row_start: int,
+                         row_end: int,
+                         band: int = 1) -> np.ndarray:
+    """
+    Reads rows `row_start:row_end` of `grid` with one extra row and column on each side, as needed by 3x3 window
+    filters. Cells outside of the grid are NaN.
+    """
+
+    halo_start = max(row_start - 1, 0)
+    halo_end = min(row_end + 1, grid.height)
+
+    values = read_block(raster, grid, halo_start, halo_end, band)
+
+    return np.pad(values,
+                  ((1 - (row_start - halo_start), 1 - (halo_end - row_end)), (1, 1)),
+                  constant_values=np.nan)
+
+
+def raster_blocks(raster: QgsRasterLayer,
+                  grid: Optional[RasterGrid] = None,
+                  block_rows: int = BLOCK_ROWS,
+                  band: int = 1) -> Iterator[Tuple[int, np.ndarray]]:
+    """
+    Yields `(first row, block)` of `raster` read on `grid` (grid of the raster itself by default), top to bottom.
+    """
+
+    if grid is None:
+        grid = RasterGrid.from_layer(raster)
+
+    for row_start, row_end in grid.row_windows(block_rows):
+        yield row_start, read_block(raster, grid, row_start, row_end, band)
+
+
+class RasterBlockWriter:
+    """
+    Creates single band GeoTIFF on `grid` and writes it block by block, NaN values are written as `no_data`.
+    """
+
+    def __init__(self,
+                 path: str,
+                 grid: RasterGrid,
+                 crs: QgsCoordinateReferenceSystem,
+                 no_data: float,
+                 data_type: Qgis.DataType = Qgis.Float32):
+
+        self.path = path
+        self.grid = grid
+        self.no_data = no_data
+        self.data_type = data_type
+
+        writer = QgsRasterFileWriter(path)
+
+        self.provider: QgsRasterDataProvider = writer.createOneBandRaster(data_type, grid.width, grid.height,
+                                                                          grid.extent, crs)
+        self.provider.setNoDataValue(1, no_data)
+        self.provider.setEditable(True)
+
+    def write(self, row_start: int, values: np.ndarray):
+
+        values = np.where(np.isnan(values), self.no_data, values) if values.dtype.kind == "f" else values
+
+        values = values.astype(NUMPY_DATA_TYPES[self.data_type])
+
+        block = QgsRasterBlock(self.data_type, self.grid.width, values.shape[0])
+        block.setData(QByteArray(values.tobytes()))
+
+        self.provider.writeBlock(block, 1, 0, row_start)
+
+    def close(self) -> QgsRasterLayer:
+
+        self.provider.setEditable(False)
+
+        self.provider = None
+
+        return QgsRasterLayer(self.path)
@@ -0,0 +1,344 @@
+from typing import Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from qgis.core import (QgsFeature,
+                       QgsGeometry,
+                       QgsWkbTypes,
+                       NULL)
+
+WINDOW_ROWS = 1024
+
+SHAPE_POLYGON = 0
+SHAPE_LINE = 1
+SHAPE_POINT = 2
+
+
+class WindowedRasterizer:
+    """
+    Burns values of vector shapes into raster grid given by top left corner, cell size and size in cells. The grid is
+    produced in windows of `window_rows` rows, so memory is bounded by the window and not by the raster size.
+
+    Rules follow `gdal:rasterize` without ALL_TOUCHED: polygons burn cells whose centre lies inside (even-odd rule, so
+    holes stay empty), every line segment burns the Bresenham line between cells of its end points (one cell per
+    step along the major axis, as `GDALdllImageLine`), points burn the cell they lie in. Shapes are burned in order
+    of adding, later shapes overwrite earlier ones.
+    """
+
+    def __init__(self,
+                 x_min: float,
+                 y_max: float,
+                 cell_size_x: float,
+                 cell_size_y: float,
+                 width: int,
+                 height: int,
+                 no_data: float,
+                 dtype=np.float32,
+                 window_rows: int = WINDOW_ROWS):
+
+        self.x_min = x_min
+        self.y_max = y_max
+        self.cell_size_x = cell_size_x
+        self.cell_size_y = cell_size_y
+        self.width = width
+        self.height = height
+        self.no_data = no_data
+        self.dtype = dtype
+        self.window_rows = window_rows
+
+        self.shapes: List[Tuple[int, float, np.ndarray]] = []
+        self.bounds: List[Tuple[float, float]] = []
+
+    def add_polygon(self, rings: List[np.ndarray], value: float):
+        """
+        Adds polygon (or multipolygon) given as list of rings, every ring (N, 2) array of vertices.
+        """
+
+        edges = [np.hstack([ring[:-1], ring[1:]]) for ring in rings if 1 < len(ring)]
+
+        if not edges:
+            return
+
+        edges = np.vstack(edges)
+
+        # horizontal edges never cross scanline
+        edges = edges[edges[:, 1] != edges[:, 3]]
+
+        if edges.size:
+            self.add_shape(SHAPE_POLYGON, value, edges)
+
+    def add_lines(self, lines: List[np.ndarray], value: float):
+        """
+        Adds lines given as list of (N, 2) arrays of vertices.
+        """
+
+        segments = [np.hstack([line[:-1], line[1:]]) for line in lines if 1 < len(line)]
+
+        if segments:
+            self.add_shape(SHAPE_LINE, value, np.vstack(segments))
+
+    def add_points(self, points: np.ndarray, value: float):
+
+        if len(points):
+            self.add_shape(SHAPE_POINT, value, np.asarray(points, dtype=np.float64).reshape(-1, 2))
+
+    def add_shape(self, shape_type: int, value: float, coordinates: np.ndarray):
+
+        ys = coordinates[:, 1::2]
+
+        self.shapes.append((shape_type, value, coordinates))
+        self.bounds.append((float(ys.min()), float(ys.max())))
+
+    def add_feature(self, feature: QgsFeature, field_index: int):
+        """
+        Adds geometry of `feature` burned with value of attribute `field_index`. Features without geometry or with
+        NULL value are skipped, as in `gdal:rasterize`.
+        """
+
+        value = feature.attributes()[field_index]
+
+        if value == NULL or not feature.hasGeometry():
+            return
+
+        value = float(value)
+
+        geometry: QgsGeometry = feature.geometry()
+
+        if QgsWkbTypes.isCurvedType(geometry.wkbType()):
+            geometry.convertToStraightSegment()
+
+        geometry_type = geometry.type()
+
+        if geometry_type == QgsWkbTypes.PolygonGeometry:
+
+            polygons = geometry.asMultiPolygon() if geometry.isMultipart() else [geometry.asPolygon()]
+
+            rings = [points_to_array(ring) for polygon in polygons for ring in polygon]
+
+            self.add_polygon(rings, value)
+
+        elif geometry_type == QgsWkbTypes.LineGeometry:
+
+            lines = geometry.asMultiPolyline() if geometry.isMultipart() else [geometry.asPolyline()]
+
+            self.add_lines([points_to_array(line) for line in lines], value)
+
+        elif geometry_type == QgsWkbTypes.PointGeometry:
+
+            points = geometry.asMultiPoint() if geometry.isMultipart() else [geometry.asPoint()]
+
+            self.add_points(points_to_array(points), value)
+
+    def windows(self) -> Iterator[Tuple[int, np.ndarray]]:
+        """
+        Yields `(first row, window)` for consecutive row windows covering the whole grid, top to bottom.
+        """
+
+        bounds = np.array(self.bounds, dtype=np.float64).reshape(-1, 2)
+
+        for row_start in range(0, self.height, self.window_rows):
+
+            row_end = min(row_start + self.window_rows, self.height)
+
+            window = np.full((row_end - row_start, self.width), self.no_data, dtype=self.dtype)
+
+            window_y_max = self.y_max - row_start * self.cell_size_y
+            window_y_min = self.y_max - row_end * self.cell_size_y
+
+            # shapes touching window, in order of adding
+            shape_indices = np.nonzero((bounds[:, 0] <= window_y_max) & (window_y_min <= bounds[:, 1]))[0]
+
+            for shape_index in shape_indices:
+
+                shape_type, value, coordinates = self.shapes[shape_index]
+
+                if shape_type == SHAPE_POLYGON:
+                    self.burn_polygon(window, row_start, coordinates, value)
+                elif shape_type == SHAPE_LINE:
+                    self.burn_lines(window, row_start, coordinates, value)
+                else:
+                    self.burn_points(window, row_start, coordinates, value)
+
+            yield row_start, window
+
+    def burn_polygon(self,
+                     window: np.ndarray,
+                     row_start: int,
+                     edges: np.ndarray,
+                     value: float):
+
+        rows_count = window.shape[0]
+
+        y_low = np.minimum(edges[:, 1], edges[:, 3])
+        y_high = np.maximum(edges[:, 1], edges[:, 3])
+
+        # rows whose cell centre can lie in half open interval [y_low, y_high) of every edge, one row wider on both
+        # sides to be safe from rounding, clipped to the window
+        first_rows = np.floor((self.y_max - y_high) / self.cell_size_y - 0.5).astype(np.int64)
+        last_rows = np.floor((self.y_max - y_low) / self.cell_size_y - 0.5).astype(np.int64) + 1
+
+        first_rows = np.maximum(first_rows, row_start)
+        last_rows = np.minimum(last_rows, row_start + rows_count - 1)
+
+        # edge table of the window, only edges spanning some of its rows
+        active = first_rows <= last_rows
+
+        if not active.any():
+            return
+
+        edges, first_rows, last_rows = edges[active], first_rows[active], last_rows[active]
+        y_low, y_high = y_low[active], y_high[active]
+
+        counts = last_rows - first_rows + 1
+
+        crossing_edges = np.repeat(np.arange(len(edges)), counts)
+
+        crossing_rows = np.repeat(first_rows, counts) + np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts,
+                                                                                            counts)
+
+        ys = self.y_max - (crossing_rows + 0.5) * self.cell_size_y
+
+        # half open crossing test, vertex shared by two edges is counted once
+        crossing = (y_low[crossing_edges] <= ys) & (ys < y_high[crossing_edges])
+
+        if not crossing.any():
+            return
+
+        crossing_edges, crossing_rows, ys = crossing_edges[crossing], crossing_rows[crossing], ys[crossing]
+
+        x1, y1, x2, y2 = edges[crossing_edges, 0], edges[crossing_edges, 1], edges[crossing_edges, 2], \
+            edges[crossing_edges, 3]
+
+        xs = x1 + (ys - y1) * (x2 - x1) / (y2 - y1)
+
+        order = np.lexsort((xs, crossing_rows))
+
+        crossing_rows = crossing_rows[order]
+        xs = xs[order]
+
+        # every row has even number of crossings, consecutive pairs are inside spans
+        span_rows = crossing_rows[0::2]
+
+        # first and after last column with cell centre inside the span
+        starts = np.clip(np.ceil((xs[0::2] - self.x_min) / self.cell_size_x - 0.5), 0, self.width).astype(np.int64)
+        ends = np.clip(np.ceil((xs[1::2] - self.x_min) / self.cell_size_x - 0.5), 0, self.width).astype(np.int64)
+
+        valid = starts < ends
+
+        if not valid.any():
+            return
+
+        span_rows, starts, ends = span_rows[valid] - row_start, starts[valid], ends[valid]
+
+        row_min = int(span_rows.min())
+        col_min = int(starts.min())
+        col_max = int(ends.max())
+
+        span_counts = np.zeros((int(span_rows.max()) - row_min + 1, col_max - col_min + 1), dtype=np.int32)
+
+        np.add.at(span_counts, (span_rows - row_min, starts - col_min), 1)
+        np.add.at(span_counts, (span_rows - row_min, ends - col_min), -1)
+
+        inside = np.cumsum(span_counts, axis=1)[:, :-1] > 0
+
+        window[row_min:row_min + span_counts.shape[0], col_min:col_max][inside] = value
+
+    def burn_lines(self,
+                   window: np.ndarray,
+                   row_start: int,
+                   segments: np.ndarray,
+                   value: float):
+        """
+        Integer Bresenham line of `GDALdllImageLine` for every segment, including both end cells. Error term of the
+        loop is replaced by its closed form, the minor axis moves after `ceil((2 * minor * step - major) /
+        (2 * major))` steps.
+        """
+
+        cols_from, rows_from = self.cells(segments[:, 0], segments[:, 1])
+        cols_to, rows_to = self.cells(segments[:, 2], segments[:, 3])
+
+        delta_cols = np.abs(cols_to - cols_from)
+        delta_rows = np.abs(rows_to - rows_from)
+
+        major = np.maximum(delta_cols, delta_rows)
+        minor = np.minimum(delta_cols, delta_rows)
+
+        counts = major + 1
+
+        segment_indices = np.repeat(np.arange(len(segments)), counts)
+
+        steps = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+
+        major = major[segment_indices]
+        minor = minor[segment_indices]
+
+        minor_steps = np.maximum(0, -((major - 2 * minor * steps) // np.maximum(2 * major, 1)))
+
+        cols_major = delta_rows[segment_indices] <= delta_cols[segment_indices]
+
+        col_steps = np.where(cols_major, steps, minor_steps)
+        row_steps = np.where(cols_major, minor_steps, steps)
+
+        cols = cols_from[segment_indices] + np.sign(cols_to - cols_from)[segment_indices] * col_steps
+        rows = rows_from[segment_indices] + np.sign(rows_to - rows_from)[segment_indices] * row_steps
+
+        self.burn_cells(window, row_start, rows, cols, value)
+
+    def burn_points(self,
+                    window: np.ndarray,
+                    row_start: int,
+                    points: np.ndarray,
+                    value: float):
+
+        cols, rows = self.cells(points[:, 0], points[:, 1])
+
+        self.burn_cells(window, row_start, rows, cols, value)
+
+    def cells(self, xs: np.ndarray, ys: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Columns and rows of the grid cells containing the coordinates.
+        """
+
+        cols = np.floor((xs - self.x_min) / self.cell_size_x).astype(np.int64)
+        rows = np.floor((self.y_max - ys) / self.cell_size_y).astype(np.int64)
+
+        return cols, rows
+
+    def burn_cells(self,
+                   window: np.ndarray,
+                   row_start: int,
+                   rows: np.ndarray,
+                   cols: np.ndarray,
+                   value: float):
+
+        rows = rows - row_start
+
+        inside = (0 <= cols) & (cols < self.width) & (0 <= rows) & (rows < window.shape[0])
+
+        window[rows[inside], cols[inside]] = value
+
+
+def points_to_array(points: List) -> np.ndarray:
+    """
+    Converts list of `QgsPointXY` to (N, 2) array.
+    """
+
+    return np.array([(point.x(), point.y()) for point in points], dtype=np.float64).reshape(-1, 2)
+
+
+def rasterize_features(rasterizer: WindowedRasterizer,
+                       features: Iterator[QgsFeature],
+                       field_index: int,
+                       progress: Optional = None) -> WindowedRasterizer:
+    """
+    Adds all `features` to `rasterizer`, `progress` is optional `ThrottledProgressBar` updated with feature count.
+    """
+
+    for number, feature in enumerate(features):
+
+        rasterizer.add_feature(feature, field_index)
+
+        if progress:
+            progress.set_value(number)
+
+    return rasterizer
@@ -0,0 +1,140 @@
+from typing import Tuple
+
+import numpy as np
+
+# weights of the three lines of 3x3 window in derivative, as in QgsDerivativeFilter
+LINE_WEIGHTS = (1, 2, 1)
+
+
+def line_derivative(before: np.ndarray,
+                    center: np.ndarray,
+                    after: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Difference `after - before` along one line of 3x3 windows and its weight, with the border fallback of
+    QgsDerivativeFilter: if one of the outer cells is nodata (NaN), half difference with the centre cell is used.
+    Differences are computed in float32 as in QGIS, so results match `native:slope`.
+    """
+
+    before_valid = ~np.isnan(before)
+    center_valid = ~np.isnan(center)
+    after_valid = ~np.isnan(after)
+
+    normal = before_valid & after_valid
+    after_missing = ~after_valid & before_valid & center_valid
+    before_missing = ~before_valid & after_valid & center_valid
+
+    with np.errstate(invalid="ignore"):
+
+        difference = np.where(normal, after - before,
+                              np.where(after_missing, center - before,
+                                       np.where(before_missing, after - center, 0)))
+
+    weight = 2 * normal.astype(np.int8) + after_missing + before_missing
+
+    return difference.astype(np.float64), weight
+
+
+def slope(values: np.ndarray,
+          cell_size_x: float,
+          cell_size_y: float) -> np.ndarray:
+    """
+    Slope in degrees of float32 array `values` with one halo row and column on each side (NaN outside of raster),
+    result has the shape of the inner part, NaN where slope cannot be computed.
+    """
+
+    height = values.shape[0] - 2
+    width = values.shape[1] - 2
+
+    sum_x = np.zeros((height, width))
+    sum_y = np.zeros((height, width))
+    weight_x = np.zeros((height, width), dtype=np.int32)
+    weight_y = np.zeros((height, width), dtype=np.int32)
+
+    for offset, line_weight in enumerate(LINE_WEIGHTS):
+
+        # row of windows, left to right
+        difference, weight = line_derivative(values[offset:offset + height, 0:width],
+                                             values[offset:offset + height, 1:width + 1],
+                                             values[offset:offset + height, 2:width + 2])
+
+        sum_x += line_weight * difference
+        weight_x += line_weight * weight
+
+        # column of windows, bottom to top
+        difference, weight = line_derivative(values[2:height + 2, offset:offset + width],
+                                             values[1:height + 1, offset:offset + width],
+                                             values[0:height, offset:offset + width])
+
+        sum_y += line_weight * difference
+        weight_y += line_weight * weight
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+
+        derivative_x = sum_x / (weight_x * cell_size_x)
+        derivative_y = sum_y / (weight_y * cell_size_y)
+
+        result = np.degrees(np.arctan(np.sqrt(derivative_x * derivative_x + derivative_y * derivative_y)))
+
+    result[(weight_x == 0) | (weight_y == 0)] = np.nan
+
+    return result.astype(np.float32)
+
+
+def slope_nodata(values: np.ndarray) -> np.ndarray:
+    """
+    Cells where `slope` of `values` (with halo) is NaN, computed without the slope itself.
+    """
+
+    height = values.shape[0] - 2
+    width = values.shape[1] - 2
+
+    valid = ~np.isnan(values)
+
+    weight_x = np.zeros((height, width), dtype=bool)
+    weight_y = np.zeros((height, width), dtype=bool)
+
+    for offset in range(3):
+
+        before = valid[offset:offset + height, 0:width]
+        center = valid[offset:offset + height, 1:width + 1]
+        after = valid[offset:offset + height, 2:width + 2]
+
+        weight_x |= (before & after) | (center & (before | after))
+
+        before = valid[2:height + 2, offset:offset + width]
+        center = valid[1:height + 1, offset:offset + width]
+        after = valid[0:height, offset:offset + width]
+
+        weight_y |= (before & after) | (center & (before | after))
+
+    return ~(weight_x & weight_y)
+
+
+def difference_mask(first: np.ndarray,
+                    second: np.ndarray,
+                    cell_size_x: float,
+                    cell_size_y: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Compares two rasters given as arrays with halo (NaN for nodata). Returns mask of inner cells where values or slopes
+    differ and mask of cells that are nodata in any of the inputs or slopes. Identical blocks skip the slope
+    computation.
+    """
+
+    first_inner = first[1:-1, 1:-1]
+    second_inner = second[1:-1, 1:-1]
+
+    if np.array_equal(first, second, equal_nan=True):
+
+        nodata = np.isnan(first_inner) | slope_nodata(first.astype(np.float32))
+
+        return np.zeros(first_inner.shape, dtype=bool), nodata
+
+    first_slope = slope(first.astype(np.float32), cell_size_x, cell_size_y)
+    second_slope = slope(second.astype(np.float32), cell_size_x, cell_size_y)
+
+    nodata = np.isnan(first_inner) | np.isnan(second_inner) | np.isnan(first_slope) | np.isnan(second_slope)
+
+    with np.errstate(invalid="ignore"):
+        changed = (first_inner != second_inner) | (first_slope != second_slope)
+
+    return changed & ~nodata, nodata
@@ -1,15 +1,19 @@
-from typing import Tuple, List, Any, Union, Optional
+from typing import Tuple, List, Any, Union, Optional, Iterable, Iterator
 import inspect
 import unicodedata
 from pathlib import Path
 
 
+from qgis.PyQt.QtWidgets import QProgressBar
+
 from qgis.core import (QgsMessageLog,
                        Qgis,
                        QgsVectorLayer,
                        QgsFeature,
                        QgsProject,
                        QgsMapLayer,
+                       QgsFeatureRequest,
+                       QgsFields,
                        NULL)
 
 from ..constants import TextConstants
@@ -51,6 +55,74 @@ def log(text):
                              Qgis.Info)
 
 
+def iterate_in_chunks(iterable: Iterable[Any],
+                      chunk_size: int) -> Iterator[List[Any]]:
+
+    chunk = []
+
+    for item in iterable:
+
+        chunk.append(item)
+
+        if chunk_size <= len(chunk):
+            yield chunk
+            chunk = []
+
+    if chunk:
+        yield chunk
+
+
+class ThrottledProgressBar:
+    """
+    Wrapper around `QProgressBar` that repaints only when progress moves by at least one of `steps` parts of the total.
+    """
+
+    def __init__(self,
+                 progress_bar: QProgressBar,
+                 total: int,
+                 steps: int = 100):
+
+        self.progress_bar = progress_bar
+
+        self.progress_bar.setMaximum(total)
+
+        self.step = max(1, total // steps)
+
+        self.last_value = None
+
+    def set_value(self, value: int):
+
+        if self.last_value is None or self.step <= value - self.last_value:
+
+            self.progress_bar.setValue(value)
+            self.last_value = value
+
+    def finish(self):
+        """
+        Sets the bar to its maximum, last values below the step are never shown by `set_value`.
+        """
+
+        self.progress_bar.setValue(self.progress_bar.maximum())
+        self.last_value = self.progress_bar.maximum()
+
+
+def attribute_request(fields: QgsFields,
+                      field_names: Optional[List[str]] = None) -> QgsFeatureRequest:
+    """
+    Feature request without geometry. If `field_names` are given only these attributes are fetched (no attributes for
+    empty list, when only feature ids are needed), otherwise all attributes are fetched. Names that are not in
+    `fields` are ignored.
+    """
+
+    request = QgsFeatureRequest()
+    request.setFlags(QgsFeatureRequest.NoGeometry)
+
+    if field_names is not None:
+        request.setSubsetOfAttributes(field_names, fields)
+
+    return request
+
+
 def evaluate_data_completeness(layer: QgsVectorLayer) -> Tuple[int, int, int]:
 
     feature: QgsFeature
@@ -59,7 +131,7 @@ def evaluate_data_completeness(layer: QgsVectorLayer) -> Tuple[int, int, int]:
     complete = 0
     partially_complete = 0
 
-    for feature in layer.getFeatures():
+    for feature in layer.getFeatures(attribute_request(layer.fields())):
 
         attributes = feature.attributes()
 
@@ -101,27 +173,60 @@ def evaluate_result_layer(layer: QgsVectorLayer) -> Tuple[bool, str]:
 def get_unique_fields_combinations(layer: QgsVectorLayer,
                                    field_names: List[str]) -> List[List[Any]]:
 
-    feature: QgsFeature
+    return get_unique_fields_combinations_multiple(layer, [field_names])[0]
+
 
-    list_of_unique_combinations = []
+def get_unique_fields_combinations_multiple(layer: QgsVectorLayer,
+                                            field_lists: List[List[str]],
+                                            fields: Optional[QgsFields] = None) -> List[List[List[Any]]]:
+    """
+    Unique combinations of values for every list of field names in `field_lists`, all computed in single scan of
+    `layer` that reads only the needed attributes and no geometry. Combinations are in order of their first
+    occurrence, NULL values are returned as None.
 
-    for feature in layer.getFeatures():
+    `layer` can also be `QgsVectorLayerFeatureSource`, then `fields` of the layer need to be provided.
+    """
 
-        feature_list = []
+    if fields is None:
+        fields = layer.fields()
+
+    field_lists_indices = []
+
+    for field_names in field_lists:
+
+        indices = []
 
         for field_name in field_names:
 
-            value = feature.attribute(field_name)
+            index = fields.lookupField(field_name)
 
-            if value == NULL:
-                feature_list.append(None)
-            else:
-                feature_list.append(value)
+            if index == -1:
+                raise KeyError(field_name)
+
+            indices.append(index)
+
+        field_lists_indices.append(indices)
+
+    request = attribute_request(fields, [field_name for field_names in field_lists for field_name in field_names])
+
+    seen_combinations = [set() for _ in field_lists]
+    unique_combinations = [[] for _ in field_lists]
+
+    feature: QgsFeature
+
+    for feature in layer.getFeatures(request):
+
+        attributes = feature.attributes()
+
+        for indices, seen, combinations in zip(field_lists_indices, seen_combinations, unique_combinations):
+
+            combination = tuple([None if attributes[index] == NULL else attributes[index] for index in indices])
 
-        if feature_list not in list_of_unique_combinations:
-            list_of_unique_combinations.append(feature_list)
+            if combination not in seen:
+                seen.add(combination)
+                combinations.append(list(combination))
 
-    return list_of_unique_combinations
+    return unique_combinations
 
 
 def is_valid_path_for_file(path: Union[str, Path],
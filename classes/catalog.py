@@ -1,26 +1,60 @@
-from typing import Optional, List, Dict, Tuple, Any
+from typing import Optional, List, Dict, Tuple, Any, Sequence
 from pathlib import Path
 import sqlite3
+import threading
 
 
 from .singleton import Singleton
 from .class_KA5 import KA5Class
+from .catalog_snapshot import CatalogTableSnapshot
+from .catalog_connection_pool import CatalogConnectionPool
 from ..constants import TextConstants
 from ..algorithms.utils import log
 
 LOG_SQL = False
 
+# number of prepared statements kept by sqlite3 for reuse, range and data queries differ only in present conditions
+STATEMENT_CACHE_SIZE = 256
+
+# the catalog is read only reference data, it is opened as immutable and memory mapped
+READ_ONLY = True
+MMAP_SIZE = 256 * 1024 * 1024
+# negative value is size in KiB
+CACHE_SIZE = -64 * 1024
+
+# answer range and data queries from in-memory snapshots of measurement tables instead of SQL queries, optional mode,
+# by default the queries run as SQL on the indexed catalog
+USE_SNAPSHOT = False
+
 
 class E3dCatalog(metaclass=Singleton):
 
     default_stat_tuple = (None, None, None, 0)
 
+    # lowest limit of parameters in single SQL statement among SQLite versions
+    max_sql_parameters = 999
+
+    # variable: (table, name of method building conditions from keyword arguments of get_<variable>_range)
+    range_variables = {"bulk_density": ("bulk_density", "prepare_bulk_density_conditions"),
+                       "corg": ("corg", "get_corg_conditions"),
+                       "canopy_cover": ("canopy_cover", "get_canopy_cover_conditions"),
+                       "roughness": ("roughness", "get_rougness_conditions"),
+                       "erodibility": ("calibration", "get_erodibility_conditions"),
+                       "skinfactor": ("calibration", "get_skinfactor_conditions"),
+                       "initmoisture": ("calibration", "get_initmoisture_conditions")}
+
     def __init__(self,
-                 database_file: Optional[str] = None):
+                 database_file: Optional[str] = None,
+                 use_snapshot: bool = USE_SNAPSHOT,
+                 statement_cache_size: int = STATEMENT_CACHE_SIZE,
+                 read_only: bool = READ_ONLY):
 
         self._data_quality_values = {}
         self._data_sources_values = {}
 
+        self.use_snapshot = use_snapshot
+        self._snapshots: Dict[str, CatalogTableSnapshot] = {}
+
         if not database_file or not Path(database_file).exists():
             database_file = "database.sqlite"
             self.database_file = Path(__file__).parent.parent / "db_catalog" / database_file
@@ -28,9 +62,64 @@ class E3dCatalog(metaclass=Singleton):
         else:
             self.database_file = Path(database_file)
 
-        self.db_connection = sqlite3.connect(self.database_file)
+        self.read_only = read_only
+        self.statement_cache_size = statement_cache_size
+
+        # every thread gets its own connection
+        self.connection_pool = CatalogConnectionPool(self.connect)
+
+        self._snapshots_lock = threading.Lock()
+
+        self.missing_indexes = self.check_indexes()
+
+    def connect(self) -> sqlite3.Connection:
+
+        if self.read_only:
+
+            # immutable database is read without locking and change detection
+            db_connection = sqlite3.connect(f"{self.database_file.absolute().as_uri()}?mode=ro&immutable=1",
+                                            uri=True,
+                                            cached_statements=self.statement_cache_size)
+
+        else:
+            db_connection = sqlite3.connect(self.database_file, cached_statements=self.statement_cache_size)
+
+        db_connection.execute(f"PRAGMA mmap_size = {MMAP_SIZE}")
+        db_connection.execute(f"PRAGMA cache_size = {CACHE_SIZE}")
 
-        self.db_cursor = self.db_connection.cursor()
+        if self.read_only:
+            db_connection.execute("PRAGMA query_only = ON")
+
+        return db_connection
+
+    def check_indexes(self) -> List[str]:
+        """
+        Checks that indexes recorded in `info` table by the catalog build step exist in the database, returns names
+        of missing ones. Without them every range query is a full table scan.
+        """
+
+        cursor = self.run_sql("PRAGMA table_info(info)", "Check indexes")
+
+        if "indexes" not in [row[1] for row in cursor.fetchall()]:
+            log("Catalog database does not record its indexes, queries will scan whole tables.")
+            return []
+
+        cursor = self.run_sql("SELECT indexes FROM info ORDER BY date DESC LIMIT 1", "Check indexes")
+
+        row = cursor.fetchone()
+
+        recorded = [name for name in row[0].split(",") if name] if row and row[0] else []
+
+        cursor = self.run_sql("SELECT name FROM sqlite_master WHERE type = 'index'", "Check indexes")
+
+        existing = [row[0] for row in cursor.fetchall()]
+
+        missing = [name for name in recorded if name not in existing]
+
+        if missing:
+            log(f"Catalog database is missing indexes: {', '.join(missing)}.")
+
+        return missing
 
     def set_data_quality(self, data: Dict) -> Dict:
 
@@ -55,9 +144,7 @@ class E3dCatalog(metaclass=Singleton):
 
             sql = f"SELECT id, name_{TextConstants.language} FROM quality_index"
 
-            self.db_cursor.execute(sql)
-
-            data = self.db_cursor.fetchall()
+            data = self.run_sql(sql).fetchall()
 
             for row in data:
                 self._data_quality_values.update({row[0]: row[1]})
@@ -83,42 +170,76 @@ class E3dCatalog(metaclass=Singleton):
 
             sql = f"SELECT id, name_{TextConstants.language} FROM source"
 
-            self.db_cursor.execute(sql)
-
-            data = self.db_cursor.fetchall()
+            data = self.run_sql(sql).fetchall()
 
             for row in data:
                 self._data_sources_values.update({row[0]: row[1]})
 
         return self._data_sources_values
 
-    def run_sql(self, sql: str, query_type: str = None):
+    def run_sql(self, sql: str, query_type: str = None, params: Sequence[Any] = ()) -> sqlite3.Cursor:
 
         if LOG_SQL:
 
             if query_type:
-                log(f"{query_type}: {sql}")
+                log(f"{query_type}: {sql} {list(params)}")
             else:
-                log(f"{sql}")
+                log(f"{sql} {list(params)}")
+
+        cursor = self.connection_pool.cursor()
 
-        self.db_cursor.execute(sql)
+        cursor.execute(sql, params)
+
+        return cursor
+
+    def where_clause(self, conds: Dict[str, Any]) -> Tuple[str, List[Any]]:
+        """
+        Builds WHERE template with `?` placeholders and list of its parameters from `{column: value}` conditions.
+        Numeric strings are bound as numbers, the same way they compared when formatted directly into SQL.
+        """
+
+        template = " AND ".join([f"{column} = ?" for column in conds.keys()])
+
+        params = [CatalogTableSnapshot.normalize_key(value) for value in conds.values()]
+
+        return template, params
+
+    def snapshot(self, table: str) -> CatalogTableSnapshot:
+        """
+        In-memory snapshot of `table`, loaded on first use.
+        """
+
+        with self._snapshots_lock:
+
+            if table not in self._snapshots:
+
+                if LOG_SQL:
+                    log(f"Loading snapshot of table: {table}")
+
+                self._snapshots[table] = CatalogTableSnapshot(self.connection_pool.cursor(), table)
+
+            return self._snapshots[table]
 
     def get_values(self, table: str, landuse_lv1_id: str, landuse_lv2_id: str, crop_id: str):
 
         wheres = []
+        params = []
 
         if landuse_lv1_id:
-            wheres.append(f"landuse_lv1_id = {landuse_lv1_id}")
+            wheres.append("landuse_lv1_id = ?")
+            params.append(CatalogTableSnapshot.normalize_key(landuse_lv1_id))
         else:
             wheres.append("landuse_lv1_id IS NULL")
 
         if landuse_lv2_id:
-            wheres.append(f"landuse_lv2_id = {landuse_lv2_id}")
+            wheres.append("landuse_lv2_id = ?")
+            params.append(CatalogTableSnapshot.normalize_key(landuse_lv2_id))
         else:
             wheres.append("landuse_lv2_id IS NULL")
 
         if crop_id:
-            wheres.append(f"crop_id = {crop_id}")
+            wheres.append("crop_id = ?")
+            params.append(CatalogTableSnapshot.normalize_key(crop_id))
         else:
             wheres.append("crop_id IS NULL")
 
@@ -127,9 +248,9 @@ class E3dCatalog(metaclass=Singleton):
         # TODO FIX query - corg and run_id are placeholders
         sql = f"SELECT bulkdensity, initmoisture, erodibility, corg, run_id, skinfactor FROM {table} {where}"
 
-        self.run_sql(sql)
+        cursor = self.run_sql(sql, params=params)
 
-        return self.db_cursor.fetchone()
+        return cursor.fetchone()
 
     def get_ka5_classes(self) -> List[str]:
 
@@ -137,9 +258,9 @@ class E3dCatalog(metaclass=Singleton):
 
         sql = "SELECT code FROM ka5_class"
 
-        self.run_sql(sql, "Get KA5 classes")
+        cursor = self.run_sql(sql, "Get KA5 classes")
 
-        rows = self.db_cursor.fetchall()
+        rows = cursor.fetchall()
 
         for row in rows:
             ka5_classes.append(row[0])
@@ -150,9 +271,9 @@ class E3dCatalog(metaclass=Singleton):
 
         sql = f"SELECT name_{TextConstants.language}, id FROM surface_condition"
 
-        self.run_sql(sql, "Get surface condition")
+        cursor = self.run_sql(sql, "Get surface condition")
 
-        rows = self.db_cursor.fetchall()
+        rows = cursor.fetchall()
 
         data = {}
 
@@ -166,9 +287,9 @@ class E3dCatalog(metaclass=Singleton):
 
         sql = f"SELECT name_{TextConstants.language}, id FROM protection_measure"
 
-        self.run_sql(sql, "Get protection measure")
+        cursor = self.run_sql(sql, "Get protection measure")
 
-        rows = self.db_cursor.fetchall()
+        rows = cursor.fetchall()
 
         data = {}
 
@@ -182,9 +303,9 @@ class E3dCatalog(metaclass=Singleton):
 
         sql = f"SELECT name_{TextConstants.language}, id FROM vegetation_condition"
 
-        self.run_sql(sql, "Get vegetation condition")
+        cursor = self.run_sql(sql, "Get vegetation condition")
 
-        rows = self.db_cursor.fetchall()
+        rows = cursor.fetchall()
 
         data = {}
 
@@ -198,9 +319,9 @@ class E3dCatalog(metaclass=Singleton):
 
         sql = f"SELECT name_{TextConstants.language}, id FROM agrotechnology"
 
-        self.run_sql(sql, "Get agrotechnology")
+        cursor = self.run_sql(sql, "Get agrotechnology")
 
-        rows = self.db_cursor.fetchall()
+        rows = cursor.fetchall()
 
         data = {}
 
@@ -220,9 +341,9 @@ class E3dCatalog(metaclass=Singleton):
 
         sql = f"SELECT name_{TextConstants.language}, id FROM landuse_lv1"
 
-        self.run_sql(sql, "Get landuse crop")
+        cursor = self.run_sql(sql, "Get landuse crop")
 
-        rows = self.db_cursor.fetchall()
+        rows = cursor.fetchall()
 
         # count += len(rows)
 
@@ -237,9 +358,9 @@ class E3dCatalog(metaclass=Singleton):
         sql = f"SELECT name_{TextConstants.language}, id, landuse_lv1_id FROM landuse_lv2 " \
             f"ORDER BY name_{TextConstants.language}"
 
-        self.run_sql(sql, "Get landuse crop")
+        cursor = self.run_sql(sql, "Get landuse crop")
 
-        rows = self.db_cursor.fetchall()
+        rows = cursor.fetchall()
 
         # count += len(rows)
 
@@ -254,9 +375,9 @@ class E3dCatalog(metaclass=Singleton):
         sql = f"SELECT name_{TextConstants.language}, id, landuse_lv2_id FROM crop " \
             f"ORDER BY name_{TextConstants.language}"
 
-        self.run_sql(sql, "Get landuse crop")
+        cursor = self.run_sql(sql, "Get landuse crop")
 
-        rows = self.db_cursor.fetchall()
+        rows = cursor.fetchall()
 
         # count += len(rows)
 
@@ -280,9 +401,9 @@ class E3dCatalog(metaclass=Singleton):
         sql = f"SELECT id, code, name_{TextConstants.language}, ka5_group_lv1_id, ka5_group_lv2_id," \
             f"ft, mt, gt, fu, mu, gu, fs, ms, gs FROM ka5_class"
 
-        self.run_sql(sql, "Get KA5 table")
+        cursor = self.run_sql(sql, "Get KA5 table")
 
-        rows = self.db_cursor.fetchall()
+        rows = cursor.fetchall()
 
         for row in rows:
             classes.append(KA5Class.from_array(row))
@@ -324,33 +445,33 @@ class E3dCatalog(metaclass=Singleton):
                                         landuse_lv1: Optional[str] = None,
                                         landuse_lv2: Optional[str] = None,
                                         agrotechnology: Optional[str] = None,
-                                        month: Optional[str] = None) -> List[str]:
+                                        month: Optional[str] = None) -> Dict[str, Any]:
 
-        conds = []
+        conds = {}
 
         if ka5_group_lv1:
-            conds.append(f"ka5_group_lv1_id = {ka5_group_lv1}")
+            conds["ka5_group_lv1_id"] = ka5_group_lv1
 
         if ka5_group_lv2:
-            conds.append(f"ka5_group_lv2_id = {ka5_group_lv2}")
+            conds["ka5_group_lv2_id"] = ka5_group_lv2
 
         if agrotechnology:
-            conds.append(f"agrotechnology_id = {agrotechnology}")
+            conds["agrotechnology_id"] = agrotechnology
 
         if ka5_class:
-            conds.append(f"ka5_class_id = {ka5_class}")
+            conds["ka5_class_id"] = ka5_class
 
         if crop:
-            conds.append(f"crop_id = {crop}")
+            conds["crop_id"] = crop
 
         if landuse_lv1:
-            conds.append(f"landuse_lv1_id = {landuse_lv1}")
+            conds["landuse_lv1_id"] = landuse_lv1
 
         if landuse_lv2:
-            conds.append(f"landuse_lv2_id = {landuse_lv2}")
+            conds["landuse_lv2_id"] = landuse_lv2
 
         if month:
-            conds.append(f"month_id = {month}")
+            conds["month_id"] = month
 
         return conds
 
@@ -375,15 +496,18 @@ class E3dCatalog(metaclass=Singleton):
 
         if 0 < len(conds):
 
-            conds = " AND ".join(conds)
+            if self.use_snapshot:
+                return self.extract_values_sources_quality(self.snapshot("bulk_density").data("bulk_density", conds))
+
+            conds, params = self.where_clause(conds)
 
             sql = (F"SELECT bulk_density, source_id, quality_index_id "
                    F" FROM bulk_density "
                    F"WHERE {conds}")
 
-            self.run_sql(sql, "Bulk density data")
+            cursor = self.run_sql(sql, "Bulk density data", params)
 
-            data = self.db_cursor.fetchall()
+            data = cursor.fetchall()
 
             return self.extract_values_sources_quality(data)
 
@@ -410,15 +534,18 @@ class E3dCatalog(metaclass=Singleton):
 
         if 0 < len(conds):
 
-            conds = " AND ".join(conds)
+            if self.use_snapshot:
+                return self.check_stat_row([self.snapshot("bulk_density").stats("bulk_density", conds)])
+
+            conds, params = self.where_clause(conds)
 
             sql = (F"SELECT MIN(bulk_density) AS min, MAX(bulk_density) AS max, "
                    F"AVG(bulk_density) AS mean, COUNT() AS count FROM bulk_density "
                    F"WHERE {conds}")
 
-            self.run_sql(sql, "Bulk density range")
+            cursor = self.run_sql(sql, "Bulk density range", params)
 
-            return self.check_stat_row(self.db_cursor.fetchall())
+            return self.check_stat_row(cursor.fetchall())
 
         else:
             return self.default_stat_tuple
@@ -430,30 +557,30 @@ class E3dCatalog(metaclass=Singleton):
                             crop: Optional[str] = None,
                             landuse_lv1: Optional[str] = None,
                             landuse_lv2: Optional[str] = None,
-                            agrotechnology: Optional[str] = None) -> List[str]:
+                            agrotechnology: Optional[str] = None) -> Dict[str, Any]:
 
-        conds = []
+        conds = {}
 
         if ka5_group_lv1:
-            conds.append(f"ka5_group_lv1_id = {ka5_group_lv1}")
+            conds["ka5_group_lv1_id"] = ka5_group_lv1
 
         if ka5_group_lv2:
-            conds.append(f"ka5_group_lv2_id = {ka5_group_lv2}")
+            conds["ka5_group_lv2_id"] = ka5_group_lv2
 
         if agrotechnology:
-            conds.append(f"agrotechnology_id = {agrotechnology}")
+            conds["agrotechnology_id"] = agrotechnology
 
         if ka5_class:
-            conds.append(f"ka5_class_id = {ka5_class}")
+            conds["ka5_class_id"] = ka5_class
 
         if crop:
-            conds.append(f"crop_id = {crop}")
+            conds["crop_id"] = crop
 
         if landuse_lv1:
-            conds.append(f"landuse_lv1_id = {landuse_lv1}")
+            conds["landuse_lv1_id"] = landuse_lv1
 
         if landuse_lv2:
-            conds.append(f"landuse_lv2_id = {landuse_lv2}")
+            conds["landuse_lv2_id"] = landuse_lv2
 
         return conds
 
@@ -476,14 +603,17 @@ class E3dCatalog(metaclass=Singleton):
 
         if 0 < len(conds):
 
-            conds = " AND ".join(conds)
+            if self.use_snapshot:
+                return self.check_stat_row([self.snapshot("corg").stats("corg", conds)])
+
+            conds, params = self.where_clause(conds)
 
             sql = (F"SELECT MIN(corg) AS min, MAX(corg) AS max, AVG(corg) as mean, COUNT() as count FROM corg "
                    F"WHERE {conds}")
 
-            self.run_sql(sql, "Corg range")
+            cursor = self.run_sql(sql, "Corg range", params)
 
-            return self.check_stat_row(self.db_cursor.fetchall())
+            return self.check_stat_row(cursor.fetchall())
 
         else:
             return self.default_stat_tuple
@@ -507,15 +637,18 @@ class E3dCatalog(metaclass=Singleton):
 
         if 0 < len(conds):
 
-            conds = " AND ".join(conds)
+            if self.use_snapshot:
+                return self.extract_values_sources_quality(self.snapshot("corg").data("corg", conds))
+
+            conds, params = self.where_clause(conds)
 
             sql = (F"SELECT corg, source_id, quality_index_id "
                    F" FROM corg "
                    F"WHERE {conds}")
 
-            self.run_sql(sql, "Corg data")
+            cursor = self.run_sql(sql, "Corg data", params)
 
-            data = self.db_cursor.fetchall()
+            data = cursor.fetchall()
 
             return self.extract_values_sources_quality(data)
 
@@ -525,21 +658,21 @@ class E3dCatalog(metaclass=Singleton):
                                     crop: Optional[str] = None,
                                     landuse_lv1: Optional[str] = None,
                                     landuse_lv2: Optional[str] = None,
-                                    month: Optional[str] = None) -> List[str]:
+                                    month: Optional[str] = None) -> Dict[str, Any]:
 
-        conds = []
+        conds = {}
 
         if month:
-            conds.append(f"month_id = {month}")
+            conds["month_id"] = month
 
         if crop:
-            conds.append(f"crop_id = {crop}")
+            conds["crop_id"] = crop
 
         if landuse_lv1:
-            conds.append(f"landuse_lv1_id = {landuse_lv1}")
+            conds["landuse_lv1_id"] = landuse_lv1
 
         if landuse_lv2:
-            conds.append(f"landuse_lv2_id = {landuse_lv2}")
+            conds["landuse_lv2_id"] = landuse_lv2
 
         return conds
 
@@ -556,7 +689,10 @@ class E3dCatalog(metaclass=Singleton):
 
         if 0 < len(conds):
 
-            conds = " AND ".join(conds)
+            if self.use_snapshot:
+                return self.check_stat_row([self.snapshot("canopy_cover").stats("canopy_cover", conds)])
+
+            conds, params = self.where_clause(conds)
 
             variable_name = "canopy_cover"
 
@@ -568,9 +704,9 @@ class E3dCatalog(metaclass=Singleton):
                 F"COUNT() as count FROM canopy_cover "
                 F"WHERE {conds}")
 
-            self.run_sql(sql, "Canopy cover range data")
+            cursor = self.run_sql(sql, "Canopy cover range data", params)
 
-            return self.check_stat_row(self.db_cursor.fetchall())
+            return self.check_stat_row(cursor.fetchall())
 
         else:
             return self.default_stat_tuple
@@ -588,15 +724,18 @@ class E3dCatalog(metaclass=Singleton):
 
         if 0 < len(conds):
 
-            conds = " AND ".join(conds)
+            if self.use_snapshot:
+                return self.extract_values_sources_quality(self.snapshot("canopy_cover").data("canopy_cover", conds))
+
+            conds, params = self.where_clause(conds)
 
             sql = (F"SELECT canopy_cover, source_id, quality_index_id "
                    F" FROM canopy_cover "
                    F"WHERE {conds}")
 
-            self.run_sql(sql, "Canopy cover data")
+            cursor = self.run_sql(sql, "Canopy cover data", params)
 
-            data = self.db_cursor.fetchall()
+            data = cursor.fetchall()
 
             return self.extract_values_sources_quality(data)
 
@@ -610,33 +749,33 @@ class E3dCatalog(metaclass=Singleton):
                                 protection_measure: Optional[str] = None,
                                 surface_condition: Optional[str] = None,
                                 vegetation_condition: Optional[str] = None,
-                                month: Optional[str] = None) -> List[str]:
+                                month: Optional[str] = None) -> Dict[str, Any]:
 
-        conds = []
+        conds = {}
 
         if agrotechnology:
-            conds.append(f"agrotechnology_id = {agrotechnology}")
+            conds["agrotechnology_id"] = agrotechnology
 
         if protection_measure:
-            conds.append(f"protection_measure_id = {protection_measure}")
+            conds["protection_measure_id"] = protection_measure
 
         if surface_condition:
-            conds.append(f"surface_condition_id = {surface_condition}")
+            conds["surface_condition_id"] = surface_condition
 
         if vegetation_condition:
-            conds.append(f"vegetation_condition_id = {vegetation_condition}")
+            conds["vegetation_condition_id"] = vegetation_condition
 
         if month:
-            conds.append(f"month_id = {month}")
+            conds["month_id"] = month
 
         if crop:
-            conds.append(f"crop_id = {crop}")
+            conds["crop_id"] = crop
 
         if landuse_lv1:
-            conds.append(f"landuse_lv1_id = {landuse_lv1}")
+            conds["landuse_lv1_id"] = landuse_lv1
 
         if landuse_lv2:
-            conds.append(f"landuse_lv2_id = {landuse_lv2}")
+            conds["landuse_lv2_id"] = landuse_lv2
 
         return conds
 
@@ -661,7 +800,10 @@ class E3dCatalog(metaclass=Singleton):
 
         if 0 < len(conds):
 
-            conds = " AND ".join(conds)
+            if self.use_snapshot:
+                return self.check_stat_row([self.snapshot("roughness").stats("roughness", conds)])
+
+            conds, params = self.where_clause(conds)
 
             variable_name = "roughness"
 
@@ -673,9 +815,9 @@ class E3dCatalog(metaclass=Singleton):
                 F"COUNT() as count FROM roughness "
                 F"WHERE {conds}")
 
-            self.run_sql(sql, "Roughness range")
+            cursor = self.run_sql(sql, "Roughness range", params)
 
-            return self.check_stat_row(self.db_cursor.fetchall())
+            return self.check_stat_row(cursor.fetchall())
 
         else:
             return self.default_stat_tuple
@@ -701,15 +843,18 @@ class E3dCatalog(metaclass=Singleton):
 
         if 0 < len(conds):
 
-            conds = " AND ".join(conds)
+            if self.use_snapshot:
+                return self.extract_values_sources_quality(self.snapshot("roughness").data("roughness", conds))
+
+            conds, params = self.where_clause(conds)
 
             sql = (F"SELECT roughness, source_id, quality_index_id "
                    F" FROM roughness "
                    F"WHERE {conds}")
 
-            self.run_sql(sql, "Roughness data")
+            cursor = self.run_sql(sql, "Roughness data", params)
 
-            data = self.db_cursor.fetchall()
+            data = cursor.fetchall()
 
             return self.extract_values_sources_quality(data)
 
@@ -725,39 +870,39 @@ class E3dCatalog(metaclass=Singleton):
                                    agrotechnology: Optional[str] = None,
                                    protection_measure: Optional[str] = None,
                                    surface_condition: Optional[str] = None,
-                                   month: Optional[str] = None) -> List[str]:
+                                   month: Optional[str] = None) -> Dict[str, Any]:
 
-        conds = []
+        conds = {}
 
         if ka5_group_lv1:
-            conds.append(f"ka5_group_lv1_id = {ka5_group_lv1}")
+            conds["ka5_group_lv1_id"] = ka5_group_lv1
 
         if ka5_group_lv2:
-            conds.append(f"ka5_group_lv2_id = {ka5_group_lv2}")
+            conds["ka5_group_lv2_id"] = ka5_group_lv2
 
         if agrotechnology:
-            conds.append(f"agrotechnology_id = {agrotechnology}")
+            conds["agrotechnology_id"] = agrotechnology
 
         if protection_measure:
-            conds.append(f"protection_measure_id = {protection_measure}")
+            conds["protection_measure_id"] = protection_measure
 
         if surface_condition:
-            conds.append(f"surface_condition_id = {surface_condition}")
+            conds["surface_condition_id"] = surface_condition
 
         if month:
-            conds.append(f"month_id = {month}")
+            conds["month_id"] = month
 
         if crop:
-            conds.append(f"crop_id = {crop}")
+            conds["crop_id"] = crop
 
         if landuse_lv1:
-            conds.append(f"landuse_lv1_id = {landuse_lv1}")
+            conds["landuse_lv1_id"] = landuse_lv1
 
         if landuse_lv2:
-            conds.append(f"landuse_lv2_id = {landuse_lv2}")
+            conds["landuse_lv2_id"] = landuse_lv2
 
         if ka5_class:
-            conds.append(f"ka5_class_id = {ka5_class}")
+            conds["ka5_class_id"] = ka5_class
 
         return conds
 
@@ -786,7 +931,10 @@ class E3dCatalog(metaclass=Singleton):
 
         if 0 < len(conds):
 
-            conds = " AND ".join(conds)
+            if self.use_snapshot:
+                return self.check_stat_row([self.snapshot("calibration").stats("erodibility", conds)])
+
+            conds, params = self.where_clause(conds)
 
             variable_name = "erodibility"
 
@@ -798,9 +946,9 @@ class E3dCatalog(metaclass=Singleton):
                 F"COUNT() as count FROM calibration "
                 F"WHERE {conds}")
 
-            self.run_sql(sql, "Erodibility range")
+            cursor = self.run_sql(sql, "Erodibility range", params)
 
-            return self.check_stat_row(self.db_cursor.fetchall())
+            return self.check_stat_row(cursor.fetchall())
 
         else:
             return self.default_stat_tuple
@@ -830,15 +978,18 @@ class E3dCatalog(metaclass=Singleton):
 
         if 0 < len(conds):
 
-            conds = " AND ".join(conds)
+            if self.use_snapshot:
+                return self.extract_values_sources_quality(self.snapshot("calibration").data("erodibility", conds))
+
+            conds, params = self.where_clause(conds)
 
             sql = (F"SELECT erodibility, source_id, quality_index_id "
                    F" FROM calibration "
                    F"WHERE {conds}")
 
-            self.run_sql(sql, "Erodibility data")
+            cursor = self.run_sql(sql, "Erodibility data", params)
 
-            data = self.db_cursor.fetchall()
+            data = cursor.fetchall()
 
             return self.extract_values_sources_quality(data)
 
@@ -854,39 +1005,39 @@ class E3dCatalog(metaclass=Singleton):
                                   agrotechnology: Optional[str] = None,
                                   protection_measure: Optional[str] = None,
                                   surface_condition: Optional[str] = None,
-                                  month: Optional[str] = None) -> List[str]:
+                                  month: Optional[str] = None) -> Dict[str, Any]:
 
-        conds = []
+        conds = {}
 
         if ka5_group_lv1:
-            conds.append(f"ka5_group_lv1_id = {ka5_group_lv1}")
+            conds["ka5_group_lv1_id"] = ka5_group_lv1
 
         if ka5_group_lv2:
-            conds.append(f"ka5_group_lv2_id = {ka5_group_lv2}")
+            conds["ka5_group_lv2_id"] = ka5_group_lv2
 
         if agrotechnology:
-            conds.append(f"agrotechnology_id = {agrotechnology}")
+            conds["agrotechnology_id"] = agrotechnology
 
         if protection_measure:
-            conds.append(f"protection_measure_id = {protection_measure}")
+            conds["protection_measure_id"] = protection_measure
 
         if surface_condition:
-            conds.append(f"surface_condition_id = {surface_condition}")
+            conds["surface_condition_id"] = surface_condition
 
         if month:
-            conds.append(f"month_id = {month}")
+            conds["month_id"] = month
 
         if crop:
-            conds.append(f"crop_id = {crop}")
+            conds["crop_id"] = crop
 
         if landuse_lv1:
-            conds.append(f"landuse_lv1_id = {landuse_lv1}")
+            conds["landuse_lv1_id"] = landuse_lv1
 
         if landuse_lv2:
-            conds.append(f"landuse_lv2_id = {landuse_lv2}")
+            conds["landuse_lv2_id"] = landuse_lv2
 
         if ka5_class:
-            conds.append(f"ka5_class_id = {ka5_class}")
+            conds["ka5_class_id"] = ka5_class
 
         return conds
 
@@ -915,7 +1066,10 @@ class E3dCatalog(metaclass=Singleton):
 
         if 0 < len(conds):
 
-            conds = " AND ".join(conds)
+            if self.use_snapshot:
+                return self.check_stat_row([self.snapshot("calibration").stats("skinfactor", conds)])
+
+            conds, params = self.where_clause(conds)
 
             variable_name = "skinfactor"
 
@@ -927,9 +1081,9 @@ class E3dCatalog(metaclass=Singleton):
                 F"COUNT() as count FROM calibration "
                 F"WHERE {conds}")
 
-            self.run_sql(sql, "Skin factor range")
+            cursor = self.run_sql(sql, "Skin factor range", params)
 
-            return self.check_stat_row(self.db_cursor.fetchall())
+            return self.check_stat_row(cursor.fetchall())
 
         else:
             return self.default_stat_tuple
@@ -959,58 +1113,89 @@ class E3dCatalog(metaclass=Singleton):
 
         if 0 < len(conds):
 
-            conds = " AND ".join(conds)
+            if self.use_snapshot:
+                return self.extract_values_sources_quality(self.snapshot("calibration").data("skinfactor", conds))
+
+            conds, params = self.where_clause(conds)
 
             sql = (F"SELECT skinfactor, source_id, quality_index_id "
                    F" FROM calibration "
                    F"WHERE {conds}")
 
-            self.run_sql(sql, "Erodibility data")
+            cursor = self.run_sql(sql, "Erodibility data", params)
 
-            data = self.db_cursor.fetchall()
+            data = cursor.fetchall()
 
             return self.extract_values_sources_quality(data)
 
         return None
 
-    def get_initmoisture_range(self,
-                               crop: Optional[str] = None,
-                               landuse_lv1: Optional[str] = None,
-                               landuse_lv2: Optional[str] = None,
-                               ka5_class: Optional[str] = None,
-                               ka5_group_lv1: Optional[str] = None,
-                               ka5_group_lv2: Optional[str] = None,
-                               agrotechnology: Optional[str] = None,
-                               protection_measure: Optional[str] = None,
-                               surface_condition: Optional[str] = None,
-                               month: Optional[str] = None):
+    def get_initmoisture_conditions(self,
+                                    crop: Optional[str] = None,
+                                    landuse_lv1: Optional[str] = None,
+                                    landuse_lv2: Optional[str] = None,
+                                    ka5_class: Optional[str] = None,
+                                    ka5_group_lv1: Optional[str] = None,
+                                    ka5_group_lv2: Optional[str] = None,
+                                    agrotechnology: Optional[str] = None,
+                                    protection_measure: Optional[str] = None,
+                                    surface_condition: Optional[str] = None,
+                                    month: Optional[str] = None) -> Dict[str, Any]:
 
-        conds = []
+        conds = {}
 
         if ka5_group_lv1:
-            conds.append(f"ka5_group_lv1_id = {ka5_group_lv1}")
+            conds["ka5_group_lv1_id"] = ka5_group_lv1
 
         if ka5_group_lv2:
-            conds.append(f"ka5_group_lv2_id = {ka5_group_lv2}")
+            conds["ka5_group_lv2_id"] = ka5_group_lv2
 
         if month:
-            conds.append(f"month_id = {month}")
+            conds["month_id"] = month
 
         if crop:
-            conds.append(f"crop_id = {crop}")
+            conds["crop_id"] = crop
 
         if landuse_lv1:
-            conds.append(f"landuse_lv1_id = {landuse_lv1}")
+            conds["landuse_lv1_id"] = landuse_lv1
 
         if landuse_lv2:
-            conds.append(f"landuse_lv2_id = {landuse_lv2}")
+            conds["landuse_lv2_id"] = landuse_lv2
 
         if ka5_class:
-            conds.append(f"ka5_class_id = {ka5_class}")
+            conds["ka5_class_id"] = ka5_class
+
+        return conds
+
+    def get_initmoisture_range(self,
+                               crop: Optional[str] = None,
+                               landuse_lv1: Optional[str] = None,
+                               landuse_lv2: Optional[str] = None,
+                               ka5_class: Optional[str] = None,
+                               ka5_group_lv1: Optional[str] = None,
+                               ka5_group_lv2: Optional[str] = None,
+                               agrotechnology: Optional[str] = None,
+                               protection_measure: Optional[str] = None,
+                               surface_condition: Optional[str] = None,
+                               month: Optional[str] = None):
+
+        conds = self.get_initmoisture_conditions(crop,
+                                                 landuse_lv1,
+                                                 landuse_lv2,
+                                                 ka5_class,
+                                                 ka5_group_lv1,
+                                                 ka5_group_lv2,
+                                                 agrotechnology,
+                                                 protection_measure,
+                                                 surface_condition,
+                                                 month)
 
         if 0 < len(conds):
 
-            conds = " AND ".join(conds)
+            if self.use_snapshot:
+                return self.check_stat_row([self.snapshot("calibration").stats("initmoisture", conds)])
+
+            conds, params = self.where_clause(conds)
 
             variable_name = "initmoisture"
 
@@ -1021,10 +1206,10 @@ class E3dCatalog(metaclass=Singleton):
                 F"AVG({variable_name}) as mean, "
                 F"COUNT() as count FROM calibration "
                 F"WHERE {conds}")
-   
-            self.run_sql(sql, "Init moisture range")
 
-            return self.check_stat_row(self.db_cursor.fetchall())
+            cursor = self.run_sql(sql, "Init moisture range", params)
+
+            return self.check_stat_row(cursor.fetchall())
 
         else:
             return self.default_stat_tuple
@@ -1048,12 +1233,101 @@ class E3dCatalog(metaclass=Singleton):
         else:
             return self.default_stat_tuple
 
+    def get_ranges_batch(self,
+                         variable_name: str,
+                         conditions: List[Dict[str, Any]]) -> List[Tuple[Optional[float], Optional[float],
+                                                                         Optional[float], Optional[float]]]:
+        """
+        Statistics (min, max, mean, count) of `variable_name` for every element of `conditions`, each being keyword
+        arguments of corresponding `get_<variable_name>_range` method. Results are the same as calling the method
+        for each element, but all of them are resolved in one pass over the in-memory snapshot or with grouped SQL
+        query joining all conditions at once.
+        """
+
+        table, conditions_method = self.range_variables[variable_name]
+
+        conditions_builder = getattr(self, conditions_method)
+
+        conds_list = [conditions_builder(**row_conditions) for row_conditions in conditions]
+
+        result = [self.default_stat_tuple] * len(conds_list)
+
+        # rows without any condition get default values, the same rows share single result
+        unique_conds: Dict[Tuple, List[int]] = {}
+
+        for i, conds in enumerate(conds_list):
+
+            if 0 < len(conds):
+
+                key = tuple([(column, CatalogTableSnapshot.normalize_key(value)) for column, value in conds.items()])
+
+                unique_conds.setdefault(key, []).append(i)
+
+        if not unique_conds:
+            return result
+
+        if self.use_snapshot:
+
+            snapshot = self.snapshot(table)
+
+            for key, rows in unique_conds.items():
+
+                stat_row = self.check_stat_row([snapshot.stats(variable_name, dict(key))])
+
+                for i in rows:
+                    result[i] = stat_row
+
+            return result
+
+        # conditions setting the same columns are joined together by plain equality, so the join can use indexes
+        groups: Dict[Tuple[str, ...], List[Tuple]] = {}
+
+        for key in unique_conds.keys():
+            groups.setdefault(tuple([column for column, _ in key]), []).append(key)
+
+        for columns, keys in groups.items():
+
+            join = " AND ".join([f"t.{column} = b.{column}" for column in columns])
+
+            # conditions are passed as VALUES of CTE (the connection is read only, so temp table can not be used),
+            # split so that statement does not exceed the limit of SQL parameters
+            rows_per_query = max(1, self.max_sql_parameters // (len(columns) + 1))
+
+            for start in range(0, len(keys), rows_per_query):
+
+                chunk = keys[start:start + rows_per_query]
+
+                values = ", ".join([f"({', '.join(['?'] * (len(columns) + 1))})"] * len(chunk))
+
+                params = [value for batch_id, key in enumerate(chunk) for value in [batch_id] + [v for _, v in key]]
+
+                sql = (
+                    F"WITH batch_conditions (batch_id, {', '.join(columns)}) AS (VALUES {values}) "
+                    F"SELECT b.batch_id, "
+                    F"MIN(t.{variable_name}) AS min, "
+                    F"MAX(t.{variable_name}) AS max, "
+                    F"AVG(t.{variable_name}) as mean, "
+                    F"COUNT(t.rowid) as count "
+                    F"FROM batch_conditions b LEFT JOIN {table} t ON {join} "
+                    F"GROUP BY b.batch_id")
+
+                cursor = self.run_sql(sql, "Batch range", params)
+
+                for row in cursor.fetchall():
+
+                    stat_row = self.check_stat_row([row[1:]])
+
+                    for i in unique_conds[chunk[row[0]]]:
+                        result[i] = stat_row
+
+        return result
+
     def get_catalog_version(self) -> float:
 
         sql = ("SELECT version FROM info ORDER BY date DESC LIMIT 1")
 
-        self.run_sql(sql)
+        cursor = self.run_sql(sql)
 
-        row = self.db_cursor.fetchall()
+        row = cursor.fetchall()
 
         return row[0][0]
@@ -0,0 +1,34 @@
+from typing import Callable
+import sqlite3
+import threading
+
+
+class CatalogConnectionPool:
+    """
+    Pool of catalog connections with one connection per thread. sqlite3 connection can only be used in the thread
+    that created it, so every thread (GUI thread, workers of QThreadPool) gets its own connection on first use and
+    keeps it for following queries. The connection is closed when its thread ends. Queries use new cursor for every
+    call, so no cursor state is shared.
+    """
+
+    def __init__(self, connect: Callable[[], sqlite3.Connection]):
+
+        self._connect = connect
+
+        self._local = threading.local()
+
+    def connection(self) -> sqlite3.Connection:
+
+        connection = getattr(self._local, "connection", None)
+
+        if connection is None:
+
+            connection = self._connect()
+
+            self._local.connection = connection
+
+        return connection
+
+    def cursor(self) -> sqlite3.Cursor:
+
+        return self.connection().cursor()
@@ -0,0 +1,168 @@
+from typing import Optional, List, Dict, Tuple, Any
+import sqlite3
+
+import numpy as np
+
+
+class CatalogTableSnapshot:
+    """
+    In-memory copy of one measurement table of the catalog.
+
+    Every column is loaded once into a NumPy array - value columns as float64 (NULL as NaN) for statistics and as
+    object arrays holding original values for raw data queries. Filter columns get a hash index
+    `{value: row indices}` built on first use, so a query is a dictionary lookup per condition and an intersection of
+    row indices instead of a SQL round trip.
+
+    Conditions are `{column: value}` dictionaries joined with AND, the same as in `E3dCatalog`, results have the same
+    shape as results of the SQL queries.
+    """
+
+    def __init__(self,
+                 db_cursor: sqlite3.Cursor,
+                 table: str):
+
+        self.table = table
+
+        db_cursor.execute(f"SELECT * FROM {table}")
+
+        column_names = [description[0] for description in db_cursor.description]
+
+        rows = db_cursor.fetchall()
+
+        self.row_count = len(rows)
+
+        self.columns: Dict[str, np.ndarray] = {}
+
+        for i, column_name in enumerate(column_names):
+
+            column = np.empty(self.row_count, dtype=object)
+            column[:] = [row[i] for row in rows]
+
+            self.columns[column_name] = column
+
+        self._numeric_columns: Dict[str, np.ndarray] = {}
+        self._indexes: Dict[str, Dict[Any, np.ndarray]] = {}
+
+    @staticmethod
+    def normalize_key(value: Any) -> Any:
+        """
+        Converts value to the form used as index key, numeric strings become numbers, so `"5"`, `5` and `5.0` are the
+        same key - as they are when formatted into SQL condition.
+        """
+
+        if isinstance(value, str):
+
+            try:
+                return int(value)
+            except ValueError:
+                pass
+
+            try:
+                return float(value)
+            except ValueError:
+                return value
+
+        return value
+
+    def numeric_column(self, column_name: str) -> np.ndarray:
+
+        if column_name not in self._numeric_columns:
+
+            values = [np.nan if value is None else value for value in self.columns[column_name].tolist()]
+
+            self._numeric_columns[column_name] = np.array(values, dtype=np.float64)
+
+        return self._numeric_columns[column_name]
+
+    def index(self, column_name: str) -> Dict[Any, np.ndarray]:
+
+        if column_name not in self._indexes:
+
+            row_lists: Dict[Any, List[int]] = {}
+
+            for row, value in enumerate(self.columns[column_name].tolist()):
+
+                if value is None:
+                    continue
+
+                row_lists.setdefault(self.normalize_key(value), []).append(row)
+
+            self._indexes[column_name] = {key: np.array(rows, dtype=np.int64) for key, rows in row_lists.items()}
+
+        return self._indexes[column_name]
+
+    def rows(self, conds: Dict[str, Any]) -> np.ndarray:
+        """
+        Indices of rows matching all conditions, in table order.
+        """
+
+        empty = np.empty(0, dtype=np.int64)
+
+        matches = []
+
+        for column_name, value in conds.items():
+
+            rows = self.index(column_name).get(self.normalize_key(value))
+
+            if rows is None:
+                return empty
+
+            matches.append(rows)
+
+        if not matches:
+            return np.arange(self.row_count, dtype=np.int64)
+
+        # intersect starting with the most selective condition
+        matches.sort(key=len)
+
+        result = matches[0]
+
+        for rows in matches[1:]:
+
+            if result.size == 0:
+                break
+
+            result = np.intersect1d(result, rows, assume_unique=True)
+
+        return result
+
+    def stats(self,
+              variable_name: str,
+              conds: Dict[str, Any]) -> Tuple[Optional[float], Optional[float], Optional[float], int]:
+        """
+        Equivalent of `SELECT MIN(variable), MAX(variable), AVG(variable), COUNT() ... WHERE conds`.
+        """
+
+        rows = self.rows(conds)
+
+        count = int(rows.size)
+
+        values = self.numeric_column(variable_name)[rows]
+
+        valid = ~np.isnan(values)
+
+        if not valid.any():
+            return None, None, None, count
+
+        raw_values = self.columns[variable_name][rows]
+
+        valid_values = values[valid]
+        valid_raw_values = raw_values[valid]
+
+        return (valid_raw_values[np.argmin(valid_values)],
+                valid_raw_values[np.argmax(valid_values)],
+                float(valid_values.mean()),
+                count)
+
+    def data(self,
+             variable_name: str,
+             conds: Dict[str, Any]) -> List[Tuple[Any, Any, Any]]:
+        """
+        Equivalent of `SELECT variable, source_id, quality_index_id ... WHERE conds`.
+        """
+
+        rows = self.rows(conds)
+
+        return list(zip(self.columns[variable_name][rows].tolist(),
+                        self.columns["source_id"][rows].tolist(),
+                        self.columns["quality_index_id"][rows].tolist()))
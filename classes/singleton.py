@@ -1,10 +1,20 @@
+import threading
+
+
 class Singleton(type):
 
     _instances = {}
 
+    _lock = threading.Lock()
+
     def __call__(cls, *args, **kwargs):
 
         if cls not in cls._instances:
-            cls._instances[cls] = super(Singleton, cls).__call__(*args, **kwargs)
+
+            # instance may be requested from worker threads, create it only once
+            with cls._lock:
+
+                if cls not in cls._instances:
+                    cls._instances[cls] = super(Singleton, cls).__call__(*args, **kwargs)
 
         return cls._instances[cls]
@@ -47,6 +47,8 @@ class TextConstantsCZ:
     tool_gb_fs = "jemný písek (FT): 0.063 – 0.2mm"
     tool_gb_ms = "střední písek (MT): 0.2 – 0.63mm"
     tool_gb_gs = "hrubý písek (GT): 0.63 – 2.0mm"
+    tool_gb_diagnostic = "Diagnostický režim (vypsat průběh výpočtu pro jednotlivé prvky)?"
+    tool_gb_diagnostic_sample = "Počet prvků vypsaných v diagnostickém režimu:"
 
     tool_ppp_name = "Zpracovat data ze záznamových bodů"
     tool_ppp_help = "Nástroj převede data ze záznamových bodů (pp_data.csv) do nové struktury pro snazší vytváření hydrogramů a sedimentogramů a přepočte hodnoty výstupů do běžně používaných jednotek (l/s, m3, kg) = Výsledky upravené.\n\nZároveň je možné uložit agregované hodnoty pro celou simulovanou událost (maximální průtok, celkový odtok, celkové množství transportovaného sedimentu) = Výsledky sumarizované.\n\nDo výsledků může být započten pouze plošný povrchový odtok („Runoff“, „Sedvol“ atd.), nebo součet plošného a soustředěného odtoku („ChRunoff“, „ChSedvol“ atd.)"
@@ -293,6 +295,8 @@ class TextConstantsCZ:
 
     dialog_export_label_exported = "Data úspěšně exportována."
 
+    dialog_export_label_export_failed = "Export se nezdařil pro:"
+
     dialog_export_label_exporting = "Data se exportují..."
 
     dialog_export_label_not_exported = "Data nebyla nastavena k exportu."
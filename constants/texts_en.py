@@ -46,6 +46,8 @@ class TextConstantsEN:
     tool_gb_fs = "Fine sand (FT): 0.063 – 0.2mm"
     tool_gb_ms = "Medium sand (MT): 0.2 – 0.63mm"
     tool_gb_gs = "Course sand (GT): 0.63 – 2.0mm"
+    tool_gb_diagnostic = "Diagnostic mode (log per feature calculation traces)?"
+    tool_gb_diagnostic_sample = "Number of features to log in diagnostic mode:"
 
     tool_ppp_name = "Process Pour Point data"
     tool_ppp_help = "The tool transforms the pour point record (pp_data.csv) to an alternative structure more suitable for hydrographs and sedigraphs ploting. The results are recalculated to commonly used units (l/s, m3, kg) = Results converted\n\nSumarized values for the whole simulated event may saved as well (maximum discharge rate, total runoff volume, total sediment mass) = Sumarized results\n\nOnly sheet flow values may be saved („Runoff“, „Sedvol“ etc.) or combined values of channel and sheet flow („ChRunoff“, „ChSedvol“ etc.)"
@@ -292,6 +294,8 @@ class TextConstantsEN:
 
     dialog_export_label_exported = "Data successfully exported."
 
+    dialog_export_label_export_failed = "Export failed for:"
+
     dialog_export_label_exporting = "Exporting data..."
 
     dialog_export_label_not_exported = "Dataset not set up for export."
@@ -0,0 +1,91 @@
+import random
+import sqlite3
+import tempfile
+import timeit
+from pathlib import Path
+
+# Micro-benchmark of catalog range lookups: SQL with values formatted into the statement (parsed and planned on every
+# call) against `?` templates reused from sqlite3 statement cache with different cache sizes. The table is small, so
+# the time is dominated by statement preparation rather than by the table scan.
+
+ROWS = 200
+LOOKUPS = 50000
+
+FILTER_COLUMNS = ["ka5_class_id", "crop_id", "landuse_lv1_id", "landuse_lv2_id", "agrotechnology_id", "month_id"]
+
+
+def create_database(path: Path) -> None:
+
+    connection = sqlite3.connect(path)
+
+    columns = ", ".join([f"{column} INTEGER" for column in FILTER_COLUMNS])
+
+    connection.execute(f"CREATE TABLE bulk_density (id INTEGER PRIMARY KEY, {columns}, bulk_density REAL)")
+
+    rows = [[random.randint(1, 30) for _ in FILTER_COLUMNS] + [random.random()] for _ in range(ROWS)]
+
+    connection.executemany(f"INSERT INTO bulk_density VALUES (NULL, {', '.join(['?'] * (len(FILTER_COLUMNS) + 1))})",
+                           rows)
+
+    connection.commit()
+    connection.close()
+
+
+def random_conditions():
+
+    columns = random.sample(FILTER_COLUMNS, random.randint(1, 3))
+
+    return {column: random.randint(1, 30) for column in sorted(columns, key=FILTER_COLUMNS.index)}
+
+
+def formatted_lookup(cursor: sqlite3.Cursor, conds) -> None:
+
+    where = " AND ".join([f"{column} = {value}" for column, value in conds.items()])
+
+    cursor.execute(f"SELECT MIN(bulk_density), MAX(bulk_density), AVG(bulk_density), COUNT() "
+                   f"FROM bulk_density WHERE {where}")
+    cursor.fetchall()
+
+
+def parameterized_lookup(cursor: sqlite3.Cursor, conds) -> None:
+
+    where = " AND ".join([f"{column} = ?" for column in conds.keys()])
+
+    cursor.execute(f"SELECT MIN(bulk_density), MAX(bulk_density), AVG(bulk_density), COUNT() "
+                   f"FROM bulk_density WHERE {where}", list(conds.values()))
+    cursor.fetchall()
+
+
+def run(path: Path, lookup, cached_statements: int, lookups) -> float:
+
+    connection = sqlite3.connect(path, cached_statements=cached_statements)
+    cursor = connection.cursor()
+
+    duration = timeit.timeit(lambda: [lookup(cursor, conds) for conds in lookups], number=1)
+
+    connection.close()
+
+    return duration
+
+
+if __name__ == "__main__":
+
+    random.seed(42)
+
+    with tempfile.TemporaryDirectory() as folder:
+
+        path = Path(folder) / "catalog.sqlite"
+
+        create_database(path)
+
+        lookups = [random_conditions() for _ in range(LOOKUPS)]
+
+        signatures = len({tuple(conds.keys()) for conds in lookups})
+
+        print(f"{LOOKUPS} lookups, {signatures} distinct statement signatures")
+
+        print(f"formatted SQL:                {run(path, formatted_lookup, 128, lookups):.3f} s")
+
+        for cached_statements in [0, 16, 128, 256]:
+            print(f"parameterized, cache {cached_statements:>4}:    "
+                  f"{run(path, parameterized_lookup, cached_statements, lookups):.3f} s")
@@ -0,0 +1,119 @@
+import sys
+import time
+import tracemalloc
+from typing import Dict, List, Optional, Tuple
+
+from qgis.core import (QgsApplication,
+                       QgsVectorLayer,
+                       QgsFeatureRequest,
+                       QgsFeature)
+
+# Benchmark of feature iteration over dissolved soil/landuse layers: full request (geometry and all attributes, as
+# `layer.getFeatures()`) against geometry-free request with only the attributes the plugin algorithms touch. Run with
+# python of QGIS installation: `python benchmark_feature_requests.py layer.gpkg [layer.shp ...]`.
+#
+# Time is the wall time of the iteration, memory is the peak of Python allocations while features are kept (as
+# `adjust_feature_values_to_settings` keeps representative features) and the size of geometries that are read.
+
+REPEATS = 3
+
+# attributes read by algorithms, None is the full attribute list
+ALGORITHM_FIELDS = {"landuse_with_crops": ["landuse", "crop"],
+                    "add_fields_to_landuse": ["landuse_crop"],
+                    "add_field_with_constant_value": [],
+                    "add_fid_field": [],
+                    "adjust_feature_values_to_settings": ["landuse_crop", "ka5_id", "ka5_name", "ka5_code",
+                                                          "Soil_ID"],
+                    "evaluate_data_completeness": None}
+
+
+def full_request() -> QgsFeatureRequest:
+
+    return QgsFeatureRequest()
+
+
+def attribute_request(layer: QgsVectorLayer,
+                      field_names: Optional[List[str]]) -> QgsFeatureRequest:
+
+    request = QgsFeatureRequest()
+    request.setFlags(QgsFeatureRequest.NoGeometry)
+
+    if field_names is not None:
+        request.setSubsetOfAttributes(field_names, layer.fields())
+
+    return request
+
+
+def iterate(layer: QgsVectorLayer,
+            request: QgsFeatureRequest) -> Tuple[float, int, int]:
+    """
+    Returns best time of `REPEATS` iterations, peak of Python memory and bytes of fetched geometries.
+    """
+
+    best_time = None
+
+    for _ in range(REPEATS):
+
+        start = time.perf_counter()
+
+        for feature in layer.getFeatures(request):
+            feature.attributes()
+
+        elapsed = time.perf_counter() - start
+
+        if best_time is None or elapsed < best_time:
+            best_time = elapsed
+
+    tracemalloc.start()
+
+    features: List[QgsFeature] = []
+    geometry_bytes = 0
+
+    for feature in layer.getFeatures(request):
+
+        features.append(feature)
+
+        if feature.hasGeometry():
+            geometry_bytes += feature.geometry().constGet().wkbSize()
+
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return best_time, peak, geometry_bytes
+
+
+def benchmark_layer(path: str) -> Dict[str, Tuple[Tuple[float, int, int], Tuple[float, int, int]]]:
+
+    layer = QgsVectorLayer(path, "layer", "ogr")
+
+    if not layer.isValid():
+        raise ValueError(f"Cannot load layer `{path}`.")
+
+    full = iterate(layer, full_request())
+
+    return {name: (full, iterate(layer, attribute_request(layer, field_names)))
+            for name, field_names in ALGORITHM_FIELDS.items()}
+
+
+def print_results(path: str,
+                  results: Dict[str, Tuple[Tuple[float, int, int], Tuple[float, int, int]]]) -> None:
+
+    print(path)
+
+    for name, ((full_time, full_memory, full_geometry), (subset_time, subset_memory, subset_geometry)) in \
+            results.items():
+
+        print(f" - {name}: time {full_time:.3f} s -> {subset_time:.3f} s ({full_time / max(subset_time, 1e-9):.1f}x), "
+              f"memory {full_memory / 2**20:.1f} MB -> {subset_memory / 2**20:.1f} MB, "
+              f"geometry {full_geometry / 2**20:.1f} MB -> {subset_geometry / 2**20:.1f} MB")
+
+
+if __name__ == "__main__":
+
+    qgs = QgsApplication([], False)
+    qgs.initQgis()
+
+    for layer_path in sys.argv[1:]:
+        print_results(layer_path, benchmark_layer(layer_path))
+
+    qgs.exitQgis()
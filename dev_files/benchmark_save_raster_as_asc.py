@@ -0,0 +1,92 @@
+import importlib
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from qgis.core import (QgsApplication,
+                       QgsRasterLayer)
+
+# Benchmark of ESRI ASCII grid export: `gdal:translate` (previous implementation of `save_raster_as_asc`) against
+# streaming `AsciiGridWriter`. Run with python of QGIS installation:
+# `python benchmark_save_raster_as_asc.py raster.tif [raster.tif ...]`. Both outputs are read back and compared.
+
+PLUGIN_FOLDER = Path(__file__).parent.parent
+
+# gdal:translate data types used by ExportWorker - Int16 for FID rasters, Float64 for DEM
+OUT_TYPES = [2, 7]
+
+
+def save_raster_as_asc_gdal(raster: QgsRasterLayer, path: str, out_type: int) -> None:
+
+    from qgis import processing
+
+    no_data = raster.dataProvider().sourceNoDataValue(1)
+
+    if no_data < -9999:
+        no_data = -9999
+
+    processing.run("gdal:translate", {'INPUT': raster,
+                                      'TARGET_CRS': raster.crs(),
+                                      'NODATA': no_data,
+                                      'COPY_SUBDATASETS': False,
+                                      'OPTIONS': '',
+                                      'EXTRA': '',
+                                      'DATA_TYPE': out_type,
+                                      'OUTPUT': path})
+
+
+def read_asc(path: Path) -> np.ndarray:
+
+    return np.loadtxt(path, skiprows=6)
+
+
+def benchmark_raster(raster_path: str, folder: Path) -> None:
+
+    save_raster_as_asc = importlib.import_module(f"{PLUGIN_FOLDER.name}.algorithms.algs").save_raster_as_asc
+
+    raster = QgsRasterLayer(raster_path)
+
+    if not raster.isValid():
+        raise ValueError(f"Cannot load raster `{raster_path}`.")
+
+    print(f"{raster_path} ({raster.width()} x {raster.height()})")
+
+    for out_type in OUT_TYPES:
+
+        path_gdal = folder / f"gdal_{out_type}.asc"
+        path_stream = folder / f"stream_{out_type}.asc"
+
+        start = time.perf_counter()
+        save_raster_as_asc_gdal(raster, str(path_gdal), out_type)
+        time_gdal = time.perf_counter() - start
+
+        start = time.perf_counter()
+        save_raster_as_asc(raster, str(path_stream), out_type)
+        time_stream = time.perf_counter() - start
+
+        difference = np.nanmax(np.abs(read_asc(path_gdal) - read_asc(path_stream)))
+
+        print(f" - data type {out_type}: gdal:translate {time_gdal:.2f} s, streaming {time_stream:.2f} s "
+              f"({time_gdal / max(time_stream, 1e-9):.1f}x), "
+              f"size {path_gdal.stat().st_size / 2**20:.1f} MB / {path_stream.stat().st_size / 2**20:.1f} MB, "
+              f"max difference {difference}")
+
+
+if __name__ == "__main__":
+
+    sys.path.insert(0, str(PLUGIN_FOLDER.parent))
+
+    qgs = QgsApplication([], False)
+    qgs.initQgis()
+
+    from processing.core.Processing import Processing
+    Processing.initialize()
+
+    with tempfile.TemporaryDirectory() as temp_folder:
+        for path in sys.argv[1:]:
+            benchmark_raster(path, Path(temp_folder))
+
+    qgs.exitQgis()
@@ -0,0 +1,91 @@
+import sqlite3
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+# measurement tables and their value columns
+INDEXED_TABLES = {"bulk_density": ["bulk_density"],
+                  "corg": ["corg"],
+                  "canopy_cover": ["canopy_cover"],
+                  "roughness": ["roughness"],
+                  "calibration": ["erodibility", "skinfactor", "initmoisture"]}
+
+# key columns of composite indexes, one index for every leading column group used by E3dCatalog range and data queries
+INDEX_KEYS = {"ka5_class": ["ka5_class_id", "crop_id", "landuse_lv2_id", "landuse_lv1_id", "agrotechnology_id",
+                            "month_id"],
+              "ka5_group": ["ka5_group_lv1_id", "ka5_group_lv2_id", "crop_id", "landuse_lv2_id", "landuse_lv1_id"],
+              "crop": ["crop_id", "month_id", "agrotechnology_id", "landuse_lv2_id", "landuse_lv1_id"],
+              "landuse": ["landuse_lv1_id", "landuse_lv2_id", "month_id", "agrotechnology_id"]}
+
+# columns read by data queries, added to every index so that the queries are answered from the index only
+COVERED_COLUMNS = ["source_id", "quality_index_id"]
+
+
+def table_columns(connection: sqlite3.Connection, table: str) -> List[str]:
+
+    return [row[1] for row in connection.execute(f"PRAGMA table_info({table})").fetchall()]
+
+
+def index_definitions(connection: sqlite3.Connection) -> Dict[str, Tuple[str, List[str]]]:
+    """
+    Covering indexes `{name: (table, columns)}` for tables present in the catalog. Key columns missing in a table are
+    skipped, index is not created if the table does not contain its leading column.
+    """
+
+    definitions = {}
+
+    for table, value_columns in INDEXED_TABLES.items():
+
+        columns = table_columns(connection, table)
+
+        if not columns:
+            continue
+
+        covered = [column for column in value_columns + COVERED_COLUMNS if column in columns]
+
+        for key_name, key_columns in INDEX_KEYS.items():
+
+            if key_columns[0] not in columns:
+                continue
+
+            index_columns = [column for column in key_columns if column in columns]
+
+            definitions[f"idx_{table}_{key_name}"] = (table, index_columns + covered)
+
+    return definitions
+
+
+def create_catalog_indexes(path: Path) -> List[str]:
+    """
+    Creates covering indexes in catalog database, runs ANALYZE and records names of created indexes in column
+    `indexes` of the newest row of `info` table, where E3dCatalog checks them when opening the catalog.
+    """
+
+    connection = sqlite3.connect(path)
+
+    definitions = index_definitions(connection)
+
+    for name, (table, columns) in definitions.items():
+
+        connection.execute(f"DROP INDEX IF EXISTS {name}")
+        connection.execute(f"CREATE INDEX {name} ON {table} ({', '.join(columns)})")
+
+    connection.execute("ANALYZE")
+
+    if "indexes" not in table_columns(connection, "info"):
+        connection.execute("ALTER TABLE info ADD COLUMN indexes TEXT")
+
+    connection.execute("UPDATE info SET indexes = ? WHERE rowid = (SELECT rowid FROM info ORDER BY date DESC LIMIT 1)",
+                       [",".join(definitions.keys())])
+
+    connection.commit()
+    connection.close()
+
+    return list(definitions.keys())
+
+
+if __name__ == "__main__":
+
+    catalog_path = Path(__file__).parent.parent / "db_catalog" / "database.sqlite"
+
+    for index_name in create_catalog_indexes(catalog_path):
+        print(f" - {index_name}")
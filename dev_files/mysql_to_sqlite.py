@@ -3,6 +3,8 @@ from pathlib import Path
 
 from osgeo import ogr, gdal
 
+from catalog_indexes import create_catalog_indexes
+
 conn_string = "MYSQL:testcatalog,user=root,password=root,host=localhost,port=3306"
 
 mysql_ds: ogr.DataSource = ogr.Open(conn_string)
@@ -25,3 +27,11 @@ for i in range(mysql_ds.GetLayerCount()):
     print(F" - {i} : {layer.GetName()}")
 
     ds.CopyLayer(layer, layer.GetName(), options=["FID=id"])
+
+# close the data source, so that all layers are written before indexes are created
+ds = None
+
+print("Creating indexes:")
+
+for index_name in create_catalog_indexes(path.absolute()):
+    print(f" - {index_name}")
@@ -8,6 +8,7 @@ from qgis.PyQt.QtCore import QVariant
 
 from .constants import TextConstants
 from .algorithms.algorithms_layers import (join_tables,
+                                           join_tables_multiple,
                                            intersect_dissolve,
                                            copy_layer_fix_geoms,
                                            create_table_KA5_to_join,
@@ -293,6 +294,22 @@ class E3DWizardProcess:
                                          TextConstants.field_name_landuse_crops,
                                          progress_bar)
 
+    def join_parameter_tables(self,
+                              tables: List[Tuple[str, List[str], QgsVectorLayer]],
+                              progress_bar: Optional[QProgressBar] = None) -> NoReturn:
+        """
+        Joins values of parameter tables `(value field name, join fields, table layer)` to main layer in one pass,
+        values already present in main layer are replaced.
+        """
+
+        delete_fields(self.layer_main,
+                      [field_name for field_name, _, _ in tables])
+
+        self.layer_main = join_tables_multiple(self.layer_main,
+                                               [(join_fields, layer_table, join_fields)
+                                                for _, join_fields, layer_table in tables],
+                                               progress_bar)
+
     def adjust_search_values(self, table: Dict[str, str]):
 
         adjust_feature_values_to_settings(self.layer_intersected_dissolved,
@@ -308,5 +308,5 @@ class ErosionDataPreparationPlugin:
     def dialog_update_progress(self, value: int):
         self.dialog.update_progress_bar(value)
 
-    def dialog_set_finished(self):
-        self.dialog.export_finished()
+    def dialog_set_finished(self, failed_paths: list):
+        self.dialog.export_finished(failed_paths)
@@ -1,3 +1,7 @@
+from typing import Callable, List, Tuple, Optional
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import partial
+
 from qgis.PyQt.QtCore import (QRunnable,
                               QObject,
                               pyqtSignal,
@@ -6,6 +10,7 @@ from qgis.PyQt.QtCore import (QRunnable,
 from qgis.core import (QgsVectorLayer,
                        QgsRasterLayer,
                        QgsVectorFileWriter,
+                       QgsFeatureRequest,
                        QgsCoordinateTransformContext)
 
 from ..algorithms.algs import save_raster_as_asc
@@ -43,7 +48,7 @@ class ExportWorker(QRunnable):
 
         if is_valid_path_for_file(path_dem, required_suffix="asc"):
 
-            self.layer_raster_dem = layer_raster_dem
+            self.layer_raster_dem = clone_raster(layer_raster_dem)
             self.path_raster_dem = path_dem
 
     def set_export_lookup(self,
@@ -52,7 +57,7 @@ class ExportWorker(QRunnable):
 
         if is_valid_path_for_file(path_layer_lookup, required_suffix="csv"):
 
-            self.layer_lookup = layer_lookup
+            self.layer_lookup = copy_vector(layer_lookup)
             self.path_layer_lookup = path_layer_lookup
 
     def set_export_parameters(self,
@@ -61,7 +66,7 @@ class ExportWorker(QRunnable):
 
         if is_valid_path_for_file(path_layer_parameters, required_suffix="csv"):
 
-            self.layer_parameters = layer_parameters
+            self.layer_parameters = copy_vector(layer_parameters)
             self.path_layer_parameters = path_layer_parameters
 
     def set_export_rasterized(self,
@@ -70,7 +75,7 @@ class ExportWorker(QRunnable):
 
         if is_valid_path_for_file(path_raster_rasterized, required_suffix="asc"):
 
-            self.layer_raster_rasterized = layer_raster_rasterized
+            self.layer_raster_rasterized = clone_raster(layer_raster_rasterized)
             self.path_raster_rasterized = path_raster_rasterized
 
     def set_export_pour_points(self,
@@ -79,60 +84,113 @@ class ExportWorker(QRunnable):
 
         if is_valid_path_for_file(path_pour_points, required_suffix="asc"):
 
-            self.layer_pour_points_rasterized = layer_pour_points_rasterized
+            self.layer_pour_points_rasterized = clone_raster(layer_pour_points_rasterized)
             self.path_pour_points = path_pour_points
 
-    @pyqtSlot()
-    def run(self):
+    @staticmethod
+    def save_csv(layer: QgsVectorLayer, path: str):
 
         options = QgsVectorFileWriter.SaveVectorOptions()
         options.driverName = "CSV"
         options.fileEncoding = "UTF-8"
         options.layerOptions = ["STRING_QUOTING=IF_NEEDED"]
 
-        if self.layer_lookup:
+        error, error_message, _, _ = QgsVectorFileWriter.writeAsVectorFormatV3(
+            layer=layer,
+            fileName=path,
+            transformContext=QgsCoordinateTransformContext(),
+            options=options)
 
-            QgsVectorFileWriter.writeAsVectorFormatV3(layer=self.layer_lookup,
-                                                      fileName=self.path_layer_lookup,
-                                                      transformContext=QgsCoordinateTransformContext(),
-                                                      options=options)
+        if error != QgsVectorFileWriter.NoError:
+            raise IOError(error_message)
 
-        self.signals.progress.emit(1)
+    def export_tasks(self) -> List[Tuple[str, Callable[[], None]]]:
+        """
+        Output paths and exports of outputs that are set, every export writes different file from its own copy of
+        the layer.
+        """
 
-        if self.path_layer_parameters:
+        tasks = []
 
-            QgsVectorFileWriter.writeAsVectorFormatV3(layer=self.layer_parameters,
-                                                      fileName=self.path_layer_parameters,
-                                                      transformContext=QgsCoordinateTransformContext(),
-                                                      options=options)
+        if self.layer_lookup:
+            tasks.append((self.path_layer_lookup,
+                          partial(self.save_csv, self.layer_lookup, self.path_layer_lookup)))
 
-        self.signals.progress.emit(2)
+        if self.path_layer_parameters:
+            tasks.append((self.path_layer_parameters,
+                          partial(self.save_csv, self.layer_parameters, self.path_layer_parameters)))
 
         if self.layer_raster_rasterized:
+            tasks.append((self.path_raster_rasterized,
+                          partial(save_raster_as_asc, self.layer_raster_rasterized, self.path_raster_rasterized)))
 
-            save_raster_as_asc(self.layer_raster_rasterized,
-                               self.path_raster_rasterized)
+        if self.layer_pour_points_rasterized:
+            tasks.append((self.path_pour_points,
+                          partial(save_raster_as_asc, self.layer_pour_points_rasterized, self.path_pour_points)))
 
-        self.signals.progress.emit(3)
+        if self.path_raster_dem:
+            tasks.append((self.path_raster_dem,
+                          partial(save_raster_as_asc, self.layer_raster_dem, self.path_raster_dem, out_type=7)))
 
-        if self.layer_pour_points_rasterized:
+        return tasks
 
-            save_raster_as_asc(self.layer_pour_points_rasterized,
-                               self.path_pour_points)
+    @pyqtSlot()
+    def run(self):
+        """
+        Runs exports in parallel, one thread for every output. Progress is number of finished steps, outputs that are
+        not set count as finished immediately. Result carries paths of outputs that failed to export.
+        """
 
-        self.signals.progress.emit(4)
+        tasks = self.export_tasks()
+
+        finished = self.steps - len(tasks)
+
+        self.signals.progress.emit(finished)
+
+        failed_paths = []
+
+        with ThreadPoolExecutor(max_workers=max(len(tasks), 1)) as executor:
+
+            futures = {executor.submit(task): path for path, task in tasks}
+
+            for future in as_completed(futures):
+
+                try:
+                    future.result()
+                except Exception as e:
+                    log(f"Export of `{futures[future]}` failed: {e}")
+                    failed_paths.append(futures[future])
+
+                finished += 1
+
+                self.signals.progress.emit(finished)
+
+        self.signals.result.emit(failed_paths)
+
+
+def clone_raster(layer: Optional[QgsRasterLayer]) -> Optional[QgsRasterLayer]:
+    """
+    Raster layer with its own data provider, so the export thread does not read through provider of layer owned by
+    the main thread.
+    """
+
+    if layer is None:
+        return None
+
+    return layer.clone()
 
-        if self.path_raster_dem:
 
-            save_raster_as_asc(self.layer_raster_dem,
-                               self.path_raster_dem,
-                               out_type=7)
+def copy_vector(layer: Optional[QgsVectorLayer]) -> Optional[QgsVectorLayer]:
+    """
+    Memory copy of vector layer, not shared with the main thread, written by the export thread.
+    """
 
-        self.signals.progress.emit(5)
+    if layer is None:
+        return None
 
-        self.signals.result.emit()
+    return layer.materialize(QgsFeatureRequest())
 
 
 class WorkerSignals(QObject):
-    result = pyqtSignal()
+    result = pyqtSignal(list)
     progress = pyqtSignal(int)
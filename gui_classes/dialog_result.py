@@ -1,4 +1,4 @@
-from typing import NoReturn
+from typing import NoReturn, List
 from pathlib import Path
 
 from qgis.PyQt import uic
@@ -69,9 +69,14 @@ class DialogResult(QDialog):
 
         line_edit.setEnabled(False)
 
-    def export_finished(self):
+    def export_finished(self, failed_paths: List[str]):
         self.progressBar.hide()
-        self.label_data_exported.setText(TextConstants.dialog_export_label_exported)
+
+        if failed_paths:
+            self.label_data_exported.setText(f"{TextConstants.dialog_export_label_export_failed} "
+                                             f"{', '.join(failed_paths)}")
+        else:
+            self.label_data_exported.setText(TextConstants.dialog_export_label_exported)
 
     def update_progress_bar(self, value: int):
         self.progressBar.setValue(value)
@@ -0,0 +1,72 @@
+from typing import Any, Dict, List, Optional, Tuple
+import threading
+
+from qgis.PyQt.QtCore import (QRunnable,
+                              pyqtSlot)
+
+from qgis.core import (QgsVectorLayer,
+                       QgsVectorLayerFeatureSource)
+
+from ..algorithms.utils import log, get_unique_fields_combinations_multiple
+
+
+class TableDataPrefetchWorker(QRunnable):
+    """
+    Prepares data of parameter tables (unique combinations of table fields in the layer and catalog statistics
+    for every row) in a thread of QThreadPool, so that filling the table widgets later is only a widget fill.
+
+    Unique combinations for all tables are extracted in single scan of the layer, read through
+    `QgsVectorLayerFeatureSource` created in the GUI thread. Statistics are then computed table by table in order of
+    `tables`, `wait()` blocks only until the result of the given table is available.
+    """
+
+    def __init__(self,
+                 tables: List,
+                 layer: QgsVectorLayer):
+
+        super(TableDataPrefetchWorker, self).__init__()
+
+        self.setAutoDelete(False)
+
+        self.tables = tables
+
+        self.source = QgsVectorLayerFeatureSource(layer)
+        self.fields = layer.fields()
+
+        self.field_lists = [table.field_list_for_table() for table in tables]
+
+        self.results: Dict[int, Tuple[List[List[Any]], Dict[Tuple, Tuple]]] = {}
+
+        self._finished = {id(table): threading.Event() for table in tables}
+
+    @pyqtSlot()
+    def run(self):
+
+        try:
+
+            tables_data = get_unique_fields_combinations_multiple(self.source, self.field_lists, self.fields)
+
+            for table, table_data in zip(self.tables, tables_data):
+
+                self.results[id(table)] = table_data, table.stats_for_table_data(table_data)
+
+                self._finished[id(table)].set()
+
+        except Exception as e:
+
+            log(f"Prefetch of table data failed: {e}")
+
+        finally:
+
+            for finished in self._finished.values():
+                finished.set()
+
+    def wait(self, table) -> Optional[Tuple[List[List[Any]], Dict[Tuple, Tuple]]]:
+        """
+        Waits for data of `table`. Returns unique combinations of table fields and statistics for visual rows, or
+        None if the prefetch failed.
+        """
+
+        self._finished[id(table)].wait()
+
+        return self.results.get(id(table))
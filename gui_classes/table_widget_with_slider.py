@@ -20,6 +20,7 @@ from ..algorithms.algorithms_layers import join_tables
 from ..algorithms.algs import delete_fields
 from .table_widget_item import TableItemNotEditable
 from .dialog_data_info import DialogDataInfo
+from .table_data_prefetch_worker import TableDataPrefetchWorker
 
 
 class TableWidgetWithSlider(QTableWidget):
@@ -43,6 +44,8 @@ class TableWidgetWithSlider(QTableWidget):
 
         self.any_cell_empty = False
 
+        self.prefetch_worker: Optional[TableDataPrefetchWorker] = None
+
         self.column_names = column_names
 
         self.prepare_header()
@@ -122,7 +125,8 @@ class TableWidgetWithSlider(QTableWidget):
         else:
             self.set_row_color(row, self.COLOR_HIGHLIGHT)
 
-    def add_row(self, value: List[str]):
+    def add_row(self, value: List[str],
+                stats: Optional[Tuple[float, float, float, float]] = None):
 
         if not all([x is None for x in value]):
 
@@ -132,7 +136,10 @@ class TableWidgetWithSlider(QTableWidget):
             for i in range(len(value)):
                 self.setItem(row_to_put, i, TableItemNotEditable(value[i]))
 
-            min, max, mean, count = self.get_slider_values(value)
+            if stats is None:
+                stats = self.get_slider_values(value)
+
+            min, max, mean, count = stats
 
             if 0 < count:
 
@@ -213,17 +220,46 @@ class TableWidgetWithSlider(QTableWidget):
 
         return table_data_str
 
+    def set_prefetch_worker(self, worker: TableDataPrefetchWorker):
+        """
+        Sets worker preparing data for `add_data`, `add_data` then uses them instead of reading the layer and querying
+        the catalog.
+        """
+
+        self.prefetch_worker = worker
+
+    def take_prefetched_data(self) -> Optional[Tuple[List[List[Any]], Dict[Tuple, Tuple]]]:
+
+        if self.prefetch_worker is None:
+            return None
+
+        prefetched = self.prefetch_worker.wait(self)
+
+        self.prefetch_worker = None
+
+        return prefetched
+
     def add_data(self, layer: QgsVectorLayer):
 
-        table_data = get_unique_fields_combinations(layer,
-                                                    self.field_list_for_table())
+        prefetched = self.take_prefetched_data()
+
+        if prefetched is not None:
+
+            table_data, stats = prefetched
+
+        else:
+
+            table_data = get_unique_fields_combinations(layer,
+                                                        self.field_list_for_table())
+
+            stats = None
 
         self.process_passed_data_to_display(table_data)
 
         table_data = self.data_show
 
         if self.rowCount() == 0:
-            self.add_all_data(table_data)
+            self.add_all_data(table_data, stats)
 
         else:
 
@@ -232,7 +268,7 @@ class TableWidgetWithSlider(QTableWidget):
             for row in table_data:
 
                 if row not in table_existing_data:
-                    self.add_row(row)
+                    self.add_row(row, stats.get(tuple(row)) if stats else None)
 
             rows_to_remove = []
             for i in range(len(table_existing_data)):
@@ -268,22 +304,59 @@ class TableWidgetWithSlider(QTableWidget):
 
         return data_list
 
-    def add_all_data(self, table_data: List[List[Any]]):
+    def add_all_data(self, table_data: List[List[Any]],
+                     stats: Optional[Dict[Tuple, Tuple]] = None):
 
-        for row in table_data:
-            self.add_row(row)
+        table_data = [row for row in table_data if not all([x is None for x in row])]
+
+        if stats is None:
+            rows_stats = self.get_slider_values_batch(table_data)
+        else:
+            rows_stats = [stats[tuple(row)] for row in table_data]
+
+        for row, row_stats in zip(table_data, rows_stats):
+            self.add_row(row, row_stats)
 
         self.repaint()
 
     def get_slider_values(self, value: List[str]):
 
-        index = self.data_show.index(value)
+        min_val, max_val, mean_val, count_val = self.get_slider_values_batch([value])[0]
 
-        values_extract = self.data_stored[index]
+        return min_val, max_val, mean_val, count_val
 
-        min_val, max_val, mean_val, count_val = self.get_slider_stat_values(values_extract)
+    def get_slider_values_batch(self, values: List[List[str]]) -> List[Tuple[float, float, float, float]]:
 
-        return min_val, max_val, mean_val, count_val
+        return self.stats_for_rows(values, self.data_stored, self.data_show)
+
+    def stats_for_rows(self,
+                       values: List[List[str]],
+                       data_stored: List[List[Any]],
+                       data_show: List[List[str]]) -> List[Tuple[float, float, float, float]]:
+
+        # first occurrence of visual row in data_show, the same as data_show.index()
+        stored_index = {}
+
+        for i, row in enumerate(data_show):
+            stored_index.setdefault(tuple(row), i)
+
+        conditions = [self.stat_conditions(data_stored[stored_index[tuple(value)]]) for value in values]
+
+        return E3dCatalog().get_ranges_batch(self.catalog_variable(), conditions)
+
+    def stats_for_table_data(self, table_data: List[List[Any]]) -> Dict[Tuple, Tuple]:
+        """
+        Statistics for all visual rows created from `table_data`, keyed by visual row. Does not modify the widget, so
+        it can run outside of GUI thread.
+        """
+
+        data_stored, data_show = self.rows_for_display(table_data)
+
+        rows = [row for row in data_show if not all([x is None for x in row])]
+
+        return {tuple(row): row_stats for row, row_stats in zip(rows, self.stats_for_rows(rows,
+                                                                                          data_stored,
+                                                                                          data_show))}
 
     def get_layer_for_join(self) -> QgsVectorLayer:
 
@@ -336,6 +409,13 @@ class TableWidgetWithSlider(QTableWidget):
 
         return result_layer
 
+    def join_definition(self) -> Tuple[str, List[str], QgsVectorLayer]:
+        """
+        Value field, join fields and layer with table values, used to join several tables in one pass.
+        """
+
+        return self.field_to_add(), self.field_list_for_join(), self.get_layer_for_join()
+
     def get_value(self, row: int, column: int) -> Optional[float]:
 
         value = self.cellWidget(row, column).text()
@@ -366,9 +446,13 @@ class TableWidgetWithSlider(QTableWidget):
 
     def process_passed_data_to_display(self, table_data: List[List[Any]]):
 
-        self.data_stored = []
+        self.data_stored, self.data_show = self.rows_for_display(table_data)
 
-        self.data_show = []
+    def rows_for_display(self, table_data: List[List[Any]]) -> Tuple[List[List[Any]], List[List[str]]]:
+
+        data_stored = []
+
+        data_show = []
 
         for row in table_data:
 
@@ -376,9 +460,11 @@ class TableWidgetWithSlider(QTableWidget):
 
             if result_string:
 
-                self.data_show.append(result_string)
+                data_show.append(result_string)
+
+                data_stored.append(row)
 
-                self.data_stored.append(row)
+        return data_stored, data_show
 
     @abc.abstractmethod
     def field_to_add(self) -> str:
@@ -405,7 +491,11 @@ class TableWidgetWithSlider(QTableWidget):
         return
 
     @abc.abstractmethod
-    def get_slider_stat_values(self, values: List[Any]) -> Tuple[float, float, float, float]:
+    def catalog_variable(self) -> str:
+        return
+
+    @abc.abstractmethod
+    def stat_conditions(self, values: List[Any]) -> Dict[str, Any]:
         return
 
     @abc.abstractmethod
@@ -448,15 +538,17 @@ class TableWidgetBulkDensity(TableWidgetWithSlider):
                 TextConstants.field_name_ka5_group_lv1_id,
                 TextConstants.field_name_ka5_group_lv2_id]
 
-    def get_slider_stat_values(self, values: List[Any]) -> Tuple[float, float, float, float]:
+    def catalog_variable(self) -> str:
+        return "bulk_density"
 
-        return E3dCatalog().get_bulk_density_range(crop=values[0],
-                                                   landuse_lv1=values[2],
-                                                   landuse_lv2=values[1],
-                                                   ka5_class=values[4],
-                                                   agrotechnology=values[7],
-                                                   ka5_group_lv1=values[9],
-                                                   ka5_group_lv2=values[10])
+    def stat_conditions(self, values: List[Any]) -> Dict[str, Any]:
+        return {"crop": values[0],
+                "landuse_lv1": values[2],
+                "landuse_lv2": values[1],
+                "ka5_class": values[4],
+                "agrotechnology": values[7],
+                "ka5_group_lv1": values[9],
+                "ka5_group_lv2": values[10]}
 
     def row_to_string(self, row: List[Any]) -> Optional[List[str]]:
         if row[3] and row[5]:
@@ -540,14 +632,17 @@ class TableWidgetCorg(TableWidgetWithSlider):
         else:
             return None
 
-    def get_slider_stat_values(self, values: List[Any]) -> Tuple[float, float, float, float]:
-        return E3dCatalog().get_corg_range(ka5_class=values[4],
-                                           crop=values[0],
-                                           landuse_lv1=values[2],
-                                           landuse_lv2=values[1],
-                                           ka5_group_lv2=values[6],
-                                           agrotechnology=values[9],
-                                           ka5_group_lv1=values[11])
+    def catalog_variable(self) -> str:
+        return "corg"
+
+    def stat_conditions(self, values: List[Any]) -> Dict[str, Any]:
+        return {"ka5_class": values[4],
+                "crop": values[0],
+                "landuse_lv1": values[2],
+                "landuse_lv2": values[1],
+                "ka5_group_lv2": values[6],
+                "agrotechnology": values[9],
+                "ka5_group_lv1": values[11]}
 
     def prepare_fields(self) -> str:
 
@@ -607,10 +702,13 @@ class TableWidgetCanopyCover(TableWidgetWithSlider):
         else:
             return None
 
-    def get_slider_stat_values(self, values: List[Any]) -> Tuple[float, float, float, float]:
-        return E3dCatalog().get_canopy_cover_range(crop=values[0],
-                                                   landuse_lv1=values[2],
-                                                   landuse_lv2=values[1])
+    def catalog_variable(self) -> str:
+        return "canopy_cover"
+
+    def stat_conditions(self, values: List[Any]) -> Dict[str, Any]:
+        return {"crop": values[0],
+                "landuse_lv1": values[2],
+                "landuse_lv2": values[1]}
 
     def prepare_fields(self) -> str:
 
@@ -674,15 +772,18 @@ class TableWidgetRoughness(TableWidgetWithSlider):
         else:
             return None
 
-    def get_slider_stat_values(self, values: List[Any]) -> Tuple[float, float, float, float]:
-        return E3dCatalog().get_roughness_range(crop=values[0],
-                                                landuse_lv1=values[2],
-                                                landuse_lv2=values[1],
-                                                month=values[4],
-                                                agrotechnology=values[5],
-                                                surface_condition=values[6],
-                                                vegetation_condition=values[7],
-                                                protection_measure=values[8])
+    def catalog_variable(self) -> str:
+        return "roughness"
+
+    def stat_conditions(self, values: List[Any]) -> Dict[str, Any]:
+        return {"crop": values[0],
+                "landuse_lv1": values[2],
+                "landuse_lv2": values[1],
+                "month": values[4],
+                "agrotechnology": values[5],
+                "surface_condition": values[6],
+                "vegetation_condition": values[7],
+                "protection_measure": values[8]}
 
     def prepare_fields(self) -> str:
 
@@ -759,16 +860,19 @@ class TableWidgetErodibility(TableWidgetWithSlider):
         else:
             return None
 
-    def get_slider_stat_values(self, values: List[Any]) -> Tuple[float, float, float, float]:
-        return E3dCatalog().get_erodibility_range(crop=values[0],
-                                                  landuse_lv1=values[2],
-                                                  landuse_lv2=values[1],
-                                                  ka5_class=values[4],
-                                                  agrotechnology=values[7],
-                                                  protection_measure=values[8],
-                                                  surface_condition=values[9],
-                                                  ka5_group_lv1=values[11],
-                                                  ka5_group_lv2=values[12])
+    def catalog_variable(self) -> str:
+        return "erodibility"
+
+    def stat_conditions(self, values: List[Any]) -> Dict[str, Any]:
+        return {"crop": values[0],
+                "landuse_lv1": values[2],
+                "landuse_lv2": values[1],
+                "ka5_class": values[4],
+                "agrotechnology": values[7],
+                "protection_measure": values[8],
+                "surface_condition": values[9],
+                "ka5_group_lv1": values[11],
+                "ka5_group_lv2": values[12]}
 
     def prepare_fields(self) -> str:
 
@@ -851,17 +955,20 @@ class TableWidgetSkinFactor(TableWidgetWithSlider):
         else:
             return None
 
-    def get_slider_stat_values(self, values: List[Any]) -> Tuple[float, float, float, float]:
-        return E3dCatalog().get_skinfactor_range(crop=values[0],
-                                                 landuse_lv1=values[2],
-                                                 landuse_lv2=values[1],
-                                                 ka5_class=values[4],
-                                                 month=values[7],
-                                                 agrotechnology=values[8],
-                                                 protection_measure=values[9],
-                                                 surface_condition=values[10],
-                                                 ka5_group_lv1=values[12],
-                                                 ka5_group_lv2=values[13])
+    def catalog_variable(self) -> str:
+        return "skinfactor"
+
+    def stat_conditions(self, values: List[Any]) -> Dict[str, Any]:
+        return {"crop": values[0],
+                "landuse_lv1": values[2],
+                "landuse_lv2": values[1],
+                "ka5_class": values[4],
+                "month": values[7],
+                "agrotechnology": values[8],
+                "protection_measure": values[9],
+                "surface_condition": values[10],
+                "ka5_group_lv1": values[12],
+                "ka5_group_lv2": values[13]}
 
     def prepare_fields(self) -> str:
 
@@ -931,11 +1038,14 @@ class TableWidgetInitMoisture(TableWidgetWithSlider):
         else:
             return None
 
-    def get_slider_stat_values(self, values: List[Any]) -> Tuple[float, float, float, float]:
-        return E3dCatalog().get_initmoisture_range(crop=values[0],
-                                                   landuse_lv1=values[2],
-                                                   landuse_lv2=values[1],
-                                                   ka5_class=values[4])
+    def catalog_variable(self) -> str:
+        return "initmoisture"
+
+    def stat_conditions(self, values: List[Any]) -> Dict[str, Any]:
+        return {"crop": values[0],
+                "landuse_lv1": values[2],
+                "landuse_lv2": values[1],
+                "ka5_class": values[4]}
 
     def prepare_fields(self) -> str:
 
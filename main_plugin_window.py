@@ -16,6 +16,7 @@ from qgis.PyQt.QtWidgets import (QComboBox,
                                  QProgressBar,
                                  QWidget,
                                  QMessageBox)
+from qgis.PyQt.QtCore import QThreadPool
 
 from qgis.gui import (QgsMapLayerComboBox,
                       QgsFieldComboBox)
@@ -35,12 +36,14 @@ from .algorithms.utils import (log,
                                eval_string_with_variables)
 
 from .gui_classes.table_widget_landuse_assigned_catalog import TableWidgetLanduseAssignedCatalog
+from .gui_classes.table_data_prefetch_worker import TableDataPrefetchWorker
 from .gui_classes.table_widget_with_slider import (TableWidgetBulkDensity,
                                                    TableWidgetCorg,
                                                    TableWidgetCanopyCover,
                                                    TableWidgetRoughness,
                                                    TableWidgetErodibility,
-                                                   TableWidgetSkinFactor)
+                                                   TableWidgetSkinFactor,
+                                                   TableWidgetWithSlider)
 from .gui_classes.table_widget_edit_values import TableWidgetEditNumericValues
 
 from .constants import TextConstants
@@ -198,6 +201,9 @@ class MainPluginDialog(QDialog, FORM_CLASS):
 
         self.ok_result_layer = False
 
+        # prepares data of parameter tables in background
+        self.threadpool_tables = QThreadPool()
+
         self.setupUi(self)
 
         self.setWindowTitle(TextConstants.plugin_main_window_name)
@@ -854,6 +860,8 @@ class MainPluginDialog(QDialog, FORM_CLASS):
 
                 self.e3d_wizard_process.add_month_field(self.date_month)
 
+                self.prefetch_tables_data()
+
                 if not self.skip_step_table_corg():
                     self.table_corg.add_data(self.e3d_wizard_process.layer_main)
 
@@ -863,9 +871,6 @@ class MainPluginDialog(QDialog, FORM_CLASS):
 
             if i == 6:
 
-                if not self.skip_step_table_corg():
-                    self.e3d_wizard_process.layer_main = self.table_corg.join_data(self.e3d_wizard_process.layer_main)
-
                 if not self.skip_step_table_bulkdensity():
                     self.table_bulk_density.add_data(self.e3d_wizard_process.layer_main)
 
@@ -875,9 +880,6 @@ class MainPluginDialog(QDialog, FORM_CLASS):
 
             if i == 7:
 
-                if not self.skip_step_table_bulkdensity():
-                    self.e3d_wizard_process.layer_main = self.table_bulk_density.join_data(self.e3d_wizard_process.layer_main)
-
                 if not self.skip_step_table_surfacecover():
                     self.table_canopy_cover.add_data(self.e3d_wizard_process.layer_main)
 
@@ -887,9 +889,6 @@ class MainPluginDialog(QDialog, FORM_CLASS):
 
             if i == 8:
 
-                if not self.skip_step_table_surfacecover():
-                    self.e3d_wizard_process.layer_main = self.table_canopy_cover.join_data(self.e3d_wizard_process.layer_main)
-
                 if not self.skip_step_table_roughness():
                     self.table_roughness.add_data(self.e3d_wizard_process.layer_main)
 
@@ -899,20 +898,15 @@ class MainPluginDialog(QDialog, FORM_CLASS):
 
             if i == 9:
 
-                if not self.skip_step_table_roughness():
-                    self.e3d_wizard_process.layer_main = self.table_roughness.join_data(self.e3d_wizard_process.layer_main)
-
                 self.table_erodibility.add_data(self.e3d_wizard_process.layer_main)
 
             if i == 10:
 
-                self.e3d_wizard_process.layer_main = self.table_erodibility.join_data(self.e3d_wizard_process.layer_main)
-
                 self.table_skinfactor.add_data(self.e3d_wizard_process.layer_main)
 
             if i == 11:
 
-                self.e3d_wizard_process.layer_main = self.table_skinfactor.join_data(self.e3d_wizard_process.layer_main)
+                self.join_parameter_tables()
 
             if i == 12:
 
@@ -1086,6 +1080,43 @@ class MainPluginDialog(QDialog, FORM_CLASS):
             self.label_data_status_confirm.show()
             self.checkbox_export_empty_data.show()
 
+    def parameter_tables(self) -> List[TableWidgetWithSlider]:
+        """
+        Parameter tables that are not skipped, in order of wizard steps.
+        """
+
+        tables = [(self.table_corg, self.skip_step_table_corg()),
+                  (self.table_bulk_density, self.skip_step_table_bulkdensity()),
+                  (self.table_canopy_cover, self.skip_step_table_surfacecover()),
+                  (self.table_roughness, self.skip_step_table_roughness()),
+                  (self.table_erodibility, False),
+                  (self.table_skinfactor, False)]
+
+        return [table for table, skip in tables if not skip]
+
+    def prefetch_tables_data(self):
+        """
+        Starts preparing data of all parameter tables that will be shown in one background worker, the layer is
+        scanned once for all of them.
+        """
+
+        tables = self.parameter_tables()
+
+        worker = TableDataPrefetchWorker(tables, self.e3d_wizard_process.layer_main)
+
+        for table in tables:
+            table.set_prefetch_worker(worker)
+
+        self.threadpool_tables.start(worker)
+
+    def join_parameter_tables(self):
+        """
+        Joins values of all parameter tables to main layer in one pass, after the last table is filled.
+        """
+
+        self.e3d_wizard_process.join_parameter_tables([table.join_definition() for table in self.parameter_tables()],
+                                                      self.progressBar)
+
     def create_table_corg(self):
         self.table_corg = TableWidgetCorg(TextConstants.header_table_corg)
         widget = self.stackedWidget.widget(self.corg_widget_index)
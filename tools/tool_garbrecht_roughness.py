@@ -1,4 +1,7 @@
 from pathlib import Path
+from typing import List
+
+import numpy as np
 
 from qgis.PyQt.QtCore import QVariant
 from qgis.PyQt.QtGui import QIcon
@@ -7,6 +10,7 @@ from qgis.core import (QgsProcessingAlgorithm,
                        QgsProcessingParameterString,
                        QgsProcessingParameterField,
                        QgsProcessingParameterBoolean,
+                       QgsProcessingParameterNumber,
                        QgsProcessingParameterVectorLayer,
                        QgsFeature,
                        QgsFields,
@@ -17,6 +21,12 @@ from qgis.core import (QgsProcessingAlgorithm,
                        QgsFeatureSink)
 
 from ..constants import TextConstants
+from ..algorithms.utils import iterate_in_chunks
+from ..algorithms.garbrecht_roughness import (garbrecht_roughness,
+                                              fractions_from_features,
+                                              nan_to_none,
+                                              GarbrechtRoughnessSummary,
+                                              FEATURES_CHUNK_SIZE)
 
 
 class GarbrechtRougnessProcessingAlgorithm(QgsProcessingAlgorithm):
@@ -35,6 +45,8 @@ class GarbrechtRougnessProcessingAlgorithm(QgsProcessingAlgorithm):
     FS = "FS"
     MS = "MS"
     GS = "GS"
+    DIAGNOSTIC = "DIAGNOSTIC"
+    DIAGNOSTIC_SAMPLE = "DIAGNOSTIC_SAMPLE"
 
     def createInstance(self):
         return GarbrechtRougnessProcessingAlgorithm()
@@ -179,6 +191,24 @@ class GarbrechtRougnessProcessingAlgorithm(QgsProcessingAlgorithm):
             )
         )
 
+        self.addParameter(
+            QgsProcessingParameterBoolean(
+                self.DIAGNOSTIC,
+                TextConstants.tool_gb_diagnostic,
+                defaultValue=False
+            )
+        )
+
+        self.addParameter(
+            QgsProcessingParameterNumber(
+                self.DIAGNOSTIC_SAMPLE,
+                TextConstants.tool_gb_diagnostic_sample,
+                type=QgsProcessingParameterNumber.Integer,
+                defaultValue=100,
+                minValue=0
+            )
+        )
+
         self.addParameter(
             QgsProcessingParameterFeatureSink(
                 self.OUTPUT,
@@ -198,30 +228,10 @@ class GarbrechtRougnessProcessingAlgorithm(QgsProcessingAlgorithm):
         att_ms = self.parameterAsString(parameters, self.MS, context)
         att_gs = self.parameterAsString(parameters, self.GS, context)
 
-        # default field names of the fractions content
-        FTcode = "FT"
-        MTcode = "MT"
-        GTcode = "GT"
-        FUcode = "FU"
-        MUcode = "MU"
-        GUcode = "GU"
-        FScode = "FS"
-        MScode = "MS"
-        GScode = "GS"
-        # array of fraction codes - needed for iterating the fractions in right order
-        fractionCodes = [FTcode, MTcode, GTcode, FUcode, MUcode, GUcode, FScode, MScode, GScode]
-        # dictionary of the fractions classes codes and particle diameter of top and bottom bodred value
-        top = "top"
-        bot = "bottom"
-        fractions = {FTcode: {bot: 0.0, top: 0.0002},
-                     MTcode: {bot: 0.0002, top: 0.00063},
-                     GTcode: {bot: 0.00063, top: 0.002},
-                     FUcode: {bot: 0.002, top: 0.0063},
-                     MUcode: {bot: 0.0063, top: 0.02},
-                     GUcode: {bot: 0.02, top: 0.063},
-                     FScode: {bot: 0.063, top: 0.2},
-                     MScode: {bot: 0.2, top: 0.63},
-                     GScode: {bot: 0.63, top: 2.0}}
+        fraction_fields = [att_ft, att_mt, att_gt, att_fu, att_mu, att_gu, att_fs, att_ms, att_gs]
+
+        # default field names of the fractions content, used in log messages
+        fractionCodes = ["FT", "MT", "GT", "FU", "MU", "GU", "FS", "MS", "GS"]
 
         layer_input: QgsVectorLayer = self.parameterAsVectorLayer(parameters, self.INPUT, context)
 
@@ -230,20 +240,15 @@ class GarbrechtRougnessProcessingAlgorithm(QgsProcessingAlgorithm):
         field_name_d90 = self.parameterAsString(parameters, self.D90NAME, context)
         field_name_gb = self.parameterAsString(parameters, self.NNAME, context)
 
-        total = 100.0 / layer_input.dataProvider().featureCount() if layer_input.dataProvider().featureCount() else 0
-
-        layer_input.startEditing()
-
-        feature_polygon: QgsFeature
+        diagnostic = self.parameterAsBoolean(parameters, self.DIAGNOSTIC, context)
+        diagnostic_sample = self.parameterAsInt(parameters, self.DIAGNOSTIC_SAMPLE, context) if diagnostic else 0
 
-        add_fields = QgsFields()
-        add_fields.append(QgsField(field_name_gb, QVariant.Double))
-
-        if add_d90:
-            add_fields.append(QgsField(field_name_d90, QVariant.Double))
+        total = 100.0 / layer_input.dataProvider().featureCount() if layer_input.dataProvider().featureCount() else 0
 
         fields: QgsFields = layer_input.fields()
 
+        fraction_indices = [fields.lookupField(field_name) for field_name in fraction_fields]
+
         fields.append(QgsField(field_name_gb, QVariant.Double))
 
         if add_d90:
@@ -259,71 +264,78 @@ class GarbrechtRougnessProcessingAlgorithm(QgsProcessingAlgorithm):
 
         iterator = layer_input.getFeatures()
 
-        for cnt, input_feature in enumerate(iterator):
+        cnt = 0
+
+        summary = GarbrechtRoughnessSummary()
+
+        for input_features in iterate_in_chunks(iterator, FEATURES_CHUNK_SIZE):
 
             if feedback.isCanceled():
                 break
 
-            new_feature = QgsFeature(fields)
-            new_feature.setGeometry(input_feature.geometry())
+            fractions = fractions_from_features(input_features, fraction_indices)
 
-            # copy attributes
-            attributes = input_feature.attributes()
-            i = 0
-            for att in attributes:
-                new_feature.setAttribute(i, att)
-                i += 1
+            d90_values, n_values, fraction_found = garbrecht_roughness(fractions)
 
-            FTc = input_feature.attribute(att_ft)
-            MTc = FTc + input_feature.attribute(att_mt)
-            GTc = MTc + input_feature.attribute(att_gt)
-            FUc = GTc + input_feature.attribute(att_fu)
-            MUc = FUc + input_feature.attribute(att_mu)
-            GUc = MUc + input_feature.attribute(att_gu)
-            FSc = GUc + input_feature.attribute(att_fs)
-            MSc = FSc + input_feature.attribute(att_ms)
-            GSc = MSc + input_feature.attribute(att_gs)
+            summary.update(n_values, fraction_found)
 
-            cumContents = {FTcode: FTc, MTcode: MTc, GTcode: GTc, FUcode: FUc, MUcode: MUc, GUcode: GUc, FScode: FSc,
-                           MScode: MSc, GScode: GSc}
+            # per feature traces only in diagnostic mode and only for first `diagnostic_sample` features
+            traced = max(0, min(len(input_features), diagnostic_sample - cnt))
 
-            cumCont = 0
-            found = False
+            if traced:
+                self.push_feature_traces(feedback, fractions[:traced], fraction_found[:traced], fractionCodes)
 
-            for i in range(len(fractionCodes)):
+            d90_values = nan_to_none(d90_values)
+            n_values = nan_to_none(n_values)
 
-                cumCont = cumCont + input_feature.attribute(fractionCodes[i])
+            new_features = []
 
-                feedback.pushCommandInfo("{} : cummulative content: {} ; found is: {}".format(i,
-                                                                                              cumCont,
-                                                                                              found))
+            for row, input_feature in enumerate(input_features):
+
+                new_feature = QgsFeature(fields)
+                new_feature.setGeometry(input_feature.geometry())
 
-                if cumCont >= 90 and not found:
-                    upSize = fractions[fractionCodes[i]][top]
-                    botSize = fractions[fractionCodes[i]][bot]
-                    upClassIndex = fractionCodes[i]
-                    botClassIndex = fractionCodes[i - 1]
-                    upClassContent = cumContents[upClassIndex]
-                    botClassContent = cumContents[botClassIndex]
+                attributes = input_feature.attributes()
 
-                    feedback.pushWarning("{}>{} - {}>{}".format(upClassIndex, upClassContent,
-                                                                botClassIndex, botClassContent))
-                    found = True
+                attributes.append(n_values[row])
 
-            d90 = botSize + (upSize - botSize) / (upClassContent - botClassContent) * (90 - botClassContent)
+                if add_d90:
+                    attributes.append(d90_values[row])
 
-            if add_d90:
-                new_feature.setAttribute(new_feature.fieldNameIndex(field_name_d90),
-                                         d90)
+                new_feature.setAttributes(attributes)
 
-            exp = 1.0 / 6.0
-            n = (d90 ** exp) / 26.0
+                new_features.append(new_feature)
 
-            new_feature.setAttribute(new_feature.fieldNameIndex(field_name_gb),
-                                     n)
+            sink.addFeatures(new_features, QgsFeatureSink.FastInsert)
 
-            sink.addFeature(new_feature)
+            cnt += len(input_features)
 
             feedback.setProgress(int(cnt * total))
 
+        for message in summary.messages(fractionCodes):
+            feedback.pushInfo(message)
+
         return {self.OUTPUT: path_sink}
+
+    @staticmethod
+    def push_feature_traces(feedback: QgsProcessingFeedback,
+                            fractions: np.ndarray,
+                            fraction_found: np.ndarray,
+                            fraction_codes: List[str]) -> None:
+
+        cumulative = np.cumsum(fractions, axis=1)
+
+        for row in range(fractions.shape[0]):
+
+            up_index = int(fraction_found[row])
+
+            for i in range(len(fraction_codes)):
+
+                feedback.pushCommandInfo("{} : cummulative content: {} ; found is: {}".format(i,
+                                                                                              cumulative[row, i],
+                                                                                              -1 < up_index < i))
+
+            if up_index != -1:
+                feedback.pushWarning("{}>{} - {}>{}".format(fraction_codes[up_index], cumulative[row, up_index],
+                                                            fraction_codes[up_index - 1],
+                                                            cumulative[row, up_index - 1]))